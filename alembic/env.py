@@ -31,6 +31,19 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Database-specific full-text search objects are managed by hand-written
+# migrations, keep autogenerate from trying to drop them
+SEARCH_OBJECTS = {"search_vector", "ix_tasks_search_vector", "tasks_fts"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if reflected and compare_to is None and name in SEARCH_OBJECTS:
+        return False
+    if reflected and type_ == "table" and name.startswith("tasks_fts_"):
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -53,6 +66,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -76,7 +90,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
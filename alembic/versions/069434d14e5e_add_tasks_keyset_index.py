@@ -0,0 +1,33 @@
+"""add tasks keyset pagination index
+
+Revision ID: 069434d14e5e
+Revises: b6433149cc90
+Create Date: 2026-10-17 09:12:41.308514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '069434d14e5e'
+down_revision: Union[str, Sequence[str], None] = 'b6433149cc90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_tasks_user_id_created_at_id',
+        'tasks',
+        ['user_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_user_id_created_at_id', table_name='tasks')
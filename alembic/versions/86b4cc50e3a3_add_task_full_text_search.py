@@ -0,0 +1,97 @@
+"""add task full-text search
+
+Revision ID: 86b4cc50e3a3
+Revises: 97b409b86c26
+Create Date: 2026-10-17 11:20:45.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '86b4cc50e3a3'
+down_revision: Union[str, Sequence[str], None] = '97b409b86c26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        # A stored generated column is computed for every existing row when
+        # it is added, which backfills the search vectors
+        op.execute(
+            """
+            ALTER TABLE tasks ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A')
+                || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+            ) STORED
+            """
+        )
+        op.create_index(
+            'ix_tasks_search_vector',
+            'tasks',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+        )
+    elif dialect == 'sqlite':
+        op.execute(
+            """
+            CREATE VIRTUAL TABLE tasks_fts USING fts5(
+                title, description,
+                content='tasks', content_rowid='id', tokenize='porter unicode61'
+            )
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER tasks_fts_after_insert AFTER INSERT ON tasks
+            BEGIN
+                INSERT INTO tasks_fts (rowid, title, description)
+                VALUES (NEW.id, NEW.title, NEW.description);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER tasks_fts_after_delete AFTER DELETE ON tasks
+            BEGIN
+                INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                VALUES ('delete', OLD.id, OLD.title, OLD.description);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER tasks_fts_after_update
+            AFTER UPDATE OF title, description ON tasks
+            BEGIN
+                INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                VALUES ('delete', OLD.id, OLD.title, OLD.description);
+                INSERT INTO tasks_fts (rowid, title, description)
+                VALUES (NEW.id, NEW.title, NEW.description);
+            END
+            """
+        )
+        # Index the rows that already exist
+        op.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.drop_index('ix_tasks_search_vector', table_name='tasks')
+        op.drop_column('tasks', 'search_vector')
+    elif dialect == 'sqlite':
+        for trigger in ('insert', 'delete', 'update'):
+            op.execute(f'DROP TRIGGER IF EXISTS tasks_fts_after_{trigger}')
+        op.execute('DROP TABLE IF EXISTS tasks_fts')
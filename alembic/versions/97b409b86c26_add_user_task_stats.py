@@ -0,0 +1,190 @@
+"""add user task stats counters
+
+Revision ID: 97b409b86c26
+Revises: 069434d14e5e
+Create Date: 2026-10-17 10:02:17.554190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from alembic.util import CommandError
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '97b409b86c26'
+down_revision: Union[str, Sequence[str], None] = '069434d14e5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Trigger DDL as of this revision, copied from app/models/task_stats.py so the
+# migration does not change when the models do. test_task_stats_ddl_in_sync
+# checks that create_all still runs the same statements.
+def _pg_apply_delta(delta_rows: str) -> str:
+    return f"""
+    WITH delta AS ({delta_rows}),
+    totals AS (
+        INSERT INTO user_task_stats AS s (user_id, total_tasks, completed_tasks)
+        SELECT user_id, sum(sign),
+               sum(CASE WHEN coalesce(completed, false) THEN sign ELSE 0 END)
+        FROM delta
+        GROUP BY user_id
+        HAVING sum(sign) <> 0
+            OR sum(CASE WHEN coalesce(completed, false) THEN sign ELSE 0 END) <> 0
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_tasks = s.total_tasks + EXCLUDED.total_tasks,
+            completed_tasks = s.completed_tasks + EXCLUDED.completed_tasks
+    )
+    INSERT INTO user_task_daily_counts AS d (user_id, day, created_count)
+    SELECT user_id, (created_at AT TIME ZONE 'UTC')::date, sum(sign)
+    FROM delta
+    GROUP BY 1, 2
+    HAVING sum(sign) <> 0
+    ON CONFLICT (user_id, day) DO UPDATE SET
+        created_count = d.created_count + EXCLUDED.created_count;
+    """
+
+
+_PG_DELTAS = {
+    'insert': ('NEW TABLE AS new_rows', 'SELECT *, 1 AS sign FROM new_rows'),
+    'delete': ('OLD TABLE AS old_rows', 'SELECT *, -1 AS sign FROM old_rows'),
+    'update': (
+        'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+        'SELECT *, -1 AS sign FROM old_rows UNION ALL '
+        'SELECT *, 1 AS sign FROM new_rows',
+    ),
+}
+
+PG_TASK_STATS_DDL = []
+for _op, (_referencing, _delta) in _PG_DELTAS.items():
+    PG_TASK_STATS_DDL += [
+        f"""
+        CREATE OR REPLACE FUNCTION task_stats_after_{_op}() RETURNS trigger AS $$
+        BEGIN
+            {_pg_apply_delta(_delta)}
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        f'DROP TRIGGER IF EXISTS task_stats_after_{_op} ON tasks',
+        f"""
+        CREATE TRIGGER task_stats_after_{_op}
+        AFTER {_op.upper()} ON tasks
+        REFERENCING {_referencing}
+        FOR EACH STATEMENT EXECUTE FUNCTION task_stats_after_{_op}()
+        """,
+    ]
+
+PG_TASK_STATS_DROP_DDL = [
+    f'DROP FUNCTION IF EXISTS task_stats_after_{_op}() CASCADE' for _op in _PG_DELTAS
+]
+
+
+def _sqlite_apply_row(row: str, sign: int) -> str:
+    return f"""
+        INSERT OR IGNORE INTO user_task_stats (user_id, total_tasks, completed_tasks)
+        VALUES ({row}.user_id, 0, 0);
+        UPDATE user_task_stats
+        SET total_tasks = total_tasks + ({sign}),
+            completed_tasks = completed_tasks + ({sign}) * coalesce({row}.completed, 0)
+        WHERE user_id = {row}.user_id;
+        INSERT OR IGNORE INTO user_task_daily_counts (user_id, day, created_count)
+        VALUES ({row}.user_id, date({row}.created_at), 0);
+        UPDATE user_task_daily_counts
+        SET created_count = created_count + ({sign})
+        WHERE user_id = {row}.user_id AND day = date({row}.created_at);
+    """
+
+
+SQLITE_TASK_STATS_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_stats_after_insert AFTER INSERT ON tasks
+    BEGIN {_sqlite_apply_row('NEW', 1)} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_stats_after_delete AFTER DELETE ON tasks
+    BEGIN {_sqlite_apply_row('OLD', -1)} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_stats_after_update AFTER UPDATE ON tasks
+    WHEN OLD.completed IS NOT NEW.completed
+        OR OLD.user_id IS NOT NEW.user_id
+        OR OLD.created_at IS NOT NEW.created_at
+    BEGIN {_sqlite_apply_row('OLD', -1)} {_sqlite_apply_row('NEW', 1)} END
+    """,
+]
+
+SQLITE_TASK_STATS_DROP_DDL = [
+    f'DROP TRIGGER IF EXISTS task_stats_after_{_op}' for _op in _PG_DELTAS
+]
+
+TASK_STATS_DDL = {'postgresql': PG_TASK_STATS_DDL, 'sqlite': SQLITE_TASK_STATS_DDL}
+TASK_STATS_DROP_DDL = {
+    'postgresql': PG_TASK_STATS_DROP_DDL,
+    'sqlite': SQLITE_TASK_STATS_DROP_DDL,
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect not in TASK_STATS_DDL:
+        raise CommandError(
+            f'user_task_stats is kept up to date by triggers, which are only '
+            f'defined for PostgreSQL and SQLite, not {dialect}'
+        )
+
+    op.create_table('user_task_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_tasks', sa.Integer(), nullable=False),
+    sa.Column('completed_tasks', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('user_task_daily_counts',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    if dialect == 'postgresql':
+        # Block writers so no task slips between trigger creation and backfill
+        op.execute('LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE')
+        created_day = "(created_at AT TIME ZONE 'UTC')::date"
+    else:
+        created_day = 'date(created_at)'
+    for statement in TASK_STATS_DDL[dialect]:
+        op.execute(statement)
+
+    # Backfill counters from existing tasks
+    op.execute(
+        """
+        INSERT INTO user_task_stats (user_id, total_tasks, completed_tasks)
+        SELECT user_id, count(*), sum(CASE WHEN completed THEN 1 ELSE 0 END)
+        FROM tasks
+        GROUP BY user_id
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO user_task_daily_counts (user_id, day, created_count)
+        SELECT user_id, {created_day}, count(*)
+        FROM tasks
+        GROUP BY user_id, {created_day}
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    for statement in TASK_STATS_DROP_DDL.get(dialect, []):
+        op.execute(statement)
+
+    op.drop_table('user_task_daily_counts')
+    op.drop_table('user_task_stats')
@@ -2,16 +2,21 @@
 Health check and monitoring endpoints
 """
 
+import asyncio
 import os
 from datetime import datetime, timezone
 
 import psutil
-from fastapi import APIRouter, Depends
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, HTTPException, Response
 
-from app.database import get_db
-from app.utils.logging import get_logger
+from app.config import settings
+from app.database import get_pool_stats
+from app.utils.hashing import password_hasher
+from app.utils.health_sampler import health_sampler
+from app.utils.logging import get_log_stats, get_logger
+from app.utils.metrics import metrics_response
+from app.utils.token_cache import token_cache
+from app.utils.user_cache import user_profile_cache
 
 router = APIRouter()
 logger = get_logger("health")
@@ -31,63 +36,58 @@ async def health_check():
 
 
 @router.get("/detailed")
-async def detailed_health_check(db: AsyncSession = Depends(get_db)):
+async def detailed_health_check():
     """
     Detailed health check with system metrics.
+
+    Database and system checks come from the background sampler's latest
+    snapshot instead of being probed on every request.
     """
+    snapshot = await health_sampler.latest()
     health_status = {
         "status": "healthy",
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "service": "task-backend",
         "version": "1.0.0",
+        "sampled_at": snapshot["sampled_at"].isoformat(),
         "checks": {},
     }
 
     # Database check
-    try:
-        await db.execute(text("SELECT 1"))
-        health_status["checks"]["database"] = {
-            "status": "healthy",
-            "message": "Database connection successful",
-        }
-    except Exception as e:
-        health_status["checks"]["database"] = {
-            "status": "unhealthy",
-            "message": f"Database connection failed: {str(e)}",
-        }
+    database = dict(snapshot["checks"]["database"])
+    database["pool"] = get_pool_stats()
+    health_status["checks"]["database"] = database
+    if database["status"] == "unhealthy":
         health_status["status"] = "unhealthy"
-        logger.error("Database health check failed", extra={"error": str(e)})
 
     # System metrics
-    try:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-
-        health_status["checks"]["system"] = {
-            "status": "healthy",
-            "metrics": {
-                "cpu_percent": cpu_percent,
-                "memory_percent": memory.percent,
-                "memory_available_gb": round(memory.available / (1024**3), 2),
-                "disk_percent": disk.percent,
-                "disk_free_gb": round(disk.free / (1024**3), 2),
-            },
-        }
-
-        # Alert if resources are high
-        if cpu_percent > 80 or memory.percent > 80 or disk.percent > 90:
-            health_status["checks"]["system"]["status"] = "warning"
-            health_status["checks"]["system"][
-                "message"
-            ] = "High resource usage detected"
-
-    except Exception as e:
-        health_status["checks"]["system"] = {
-            "status": "unhealthy",
-            "message": f"System metrics unavailable: {str(e)}",
-        }
-        logger.error("System health check failed", extra={"error": str(e)})
+    health_status["checks"]["system"] = snapshot["checks"]["system"]
+
+    # Password hashing pool
+    hashing_stats = password_hasher.stats()
+    health_status["checks"]["password_hashing"] = {
+        "status": "warning" if hashing_stats["queue_depth"] > 0 else "healthy",
+        "metrics": hashing_stats,
+    }
+
+    # Verified token cache
+    health_status["checks"]["token_cache"] = {
+        "status": "healthy",
+        "metrics": token_cache.stats(),
+    }
+
+    # User profile cache
+    health_status["checks"]["user_profile_cache"] = {
+        "status": "healthy",
+        "metrics": user_profile_cache.stats(),
+    }
+
+    # Logging pipeline
+    log_stats = get_log_stats()
+    health_status["checks"]["logging"] = {
+        "status": "warning" if log_stats["dropped"] > 0 else "healthy",
+        "metrics": log_stats,
+    }
 
     # Application metrics
     health_status["checks"]["application"] = {
@@ -105,33 +105,14 @@ async def detailed_health_check(db: AsyncSession = Depends(get_db)):
     return health_status
 
 
-@router.get("/metrics")
+@router.get("/metrics", response_class=Response)
 async def get_metrics():
     """
-    Prometheus-style metrics endpoint.
+    Prometheus metrics, in the Prometheus text exposition format.
     """
-    metrics = []
-
-    # System metrics
-    cpu_percent = psutil.cpu_percent(interval=1)
-    memory = psutil.virtual_memory()
-    disk = psutil.disk_usage('/')
-
-    metrics.extend(
-        [
-            "# HELP system_cpu_percent CPU usage percentage",
-            "# TYPE system_cpu_percent gauge",
-            f"system_cpu_percent {cpu_percent}",
-            "",
-            "# HELP system_memory_percent Memory usage percentage",
-            "# TYPE system_memory_percent gauge",
-            f"system_memory_percent {memory.percent}",
-            "",
-            "# HELP system_disk_percent Disk usage percentage",
-            "# TYPE system_disk_percent gauge",
-            f"system_disk_percent {disk.percent}",
-            "",
-        ]
-    )
-
-    return "\n".join(metrics)
+    if not settings.enable_metrics:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    # Make sure the system gauges hold a sample before the first scrape
+    await health_sampler.latest()
+    # Reading the files of every worker is blocking I/O
+    return await asyncio.to_thread(metrics_response)
@@ -6,8 +6,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models import User
 from app.schemas.auth import CurrentUser, TokenResponse, UserResponse
-from app.utils import hash_password, verify_password
 from app.utils.auth import create_access_token, get_current_user
+from app.utils.hashing import password_hasher
+from app.utils.user_cache import get_user_profile
 
 router = APIRouter()
 
@@ -28,7 +29,8 @@ async def register(
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    user = User(email=email, name=name, hashed_password=hash_password(password))
+    hashed_password = await password_hasher.hash(password)
+    user = User(email=email, name=name, hashed_password=hashed_password)
     db.add(user)
     await db.commit()
     await db.refresh(user)
@@ -54,7 +56,7 @@ async def login(
     if (
         not user
         or not user.hashed_password
-        or not verify_password(password, user.hashed_password)
+        or not await password_hasher.verify(password, user.hashed_password)
     ):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -71,10 +73,9 @@ async def get_me(
     current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> UserResponse:
-    result = await db.execute(select(User).where(User.id == current_user.id))
-    user = result.scalar_one_or_none()
+    profile = await get_user_profile(db, current_user.id)
 
-    if not user:
+    if not profile:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return UserResponse.model_validate(user)
+    return profile
@@ -1,6 +1,8 @@
 # app/api/v1/tasks.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func, select
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy import and_, delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
@@ -8,6 +10,14 @@ from app.database import get_db
 from app.schemas.auth import CurrentUser
 from app.schemas.task import PaginatedTaskResponse
 from app.utils.auth import get_current_user
+from app.utils.etag import (
+    etag_matches,
+    fetch_conditional_task_page,
+    not_modified,
+    set_etag,
+    task_etag,
+)
+from app.utils.pagination import CountMode
 
 router = APIRouter()
 
@@ -29,51 +39,125 @@ async def create_task(
 
 @router.get("/", response_model=PaginatedTaskResponse)
 async def read_tasks(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    count: CountMode = "exact",
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Retrieve paginated tasks for the authenticated user with total count.
-    """
-    # Count total tasks for the user
-    count_result = await db.execute(
-        select(func.count(models.Task.id)).where(models.Task.user_id == current_user.id)
-    )
-    total = count_result.scalar_one()
 
-    # Fetch paginated tasks
-    result = await db.execute(
-        select(models.Task)
-        .where(models.Task.user_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
-    )
-    tasks = result.scalars().all()
+    Pass the returned `next_cursor` as `cursor` to fetch the following page
+    without the cost of a growing offset. `count` selects how `total` is
+    computed (exact, window, estimate or none).
 
-    return {"tasks": tasks, "total": total, "skip": skip, "limit": limit}
+    Responses carry a weak ETag; send it back in `If-None-Match` to get
+    304 Not Modified while the listing is unchanged.
+    """
+    return await fetch_conditional_task_page(
+        db,
+        response,
+        if_none_match,
+        [models.Task.user_id == current_user.id],
+        {
+            "user_id": current_user.id,
+            "skip": skip,
+            "limit": limit,
+            "cursor": cursor,
+            "count": count,
+        },
+        count=count,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
 
 
 @router.get("/{task_id}", response_model=schemas.TaskResponse)
 async def read_task(
     task_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user),
 ):
+    """
+    Retrieve one task. Responses carry a strong ETag; send it back in
+    `If-None-Match` to get 304 Not Modified while the task is unchanged.
+    """
+    if if_none_match:
+        # Only read the owner and version first, so a match skips loading
+        # and serializing the task
+        result = await db.execute(
+            select(models.Task.user_id, models.Task.updated_at).where(
+                models.Task.id == task_id
+            )
+        )
+        row = result.one_or_none()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        _check_task_owner(row.user_id, current_user.id)
+        etag = task_etag(task_id, row.updated_at)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
     # Fetch the task and ensure it belongs to the current user
     result = await db.execute(select(models.Task).where(models.Task.id == task_id))
     task = result.scalar_one_or_none()
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    _check_task_owner(task.user_id, current_user.id)
+
+    set_etag(response, task_etag(task_id, task.updated_at))
+    return task
+
 
-    if task.user_id != current_user.id:
+def _check_task_owner(owner_id: int, user_id: int) -> None:
+    if owner_id != user_id:
         raise HTTPException(
             status_code=403, detail="Not authorized to access this task"
         )
 
-    return task
+
+async def _write_miss_error(
+    db: AsyncSession, task_id: int, action: str
+) -> HTTPException:
+    """
+    Explain why an ownership-checked write matched no row.
+    Only runs on the failure path, so successful writes stay single-statement.
+    """
+    result = await db.execute(select(models.Task.id).where(models.Task.id == task_id))
+    if result.scalar_one_or_none() is None:
+        return HTTPException(status_code=404, detail="Task not found")
+    return HTTPException(
+        status_code=403, detail=f"Not authorized to {action} this task"
+    )
+
+
+async def _update_owned_task(
+    db: AsyncSession, task_id: int, user_id: int, values: Dict[str, Any]
+) -> models.Task:
+    """UPDATE ... WHERE id AND user_id RETURNING * in one round trip"""
+    owned = and_(models.Task.id == task_id, models.Task.user_id == user_id)
+    if values:
+        result = await db.execute(
+            update(models.Task).where(owned).values(**values).returning(models.Task)
+        )
+    else:
+        # Nothing to change, just return the task if it is ours
+        result = await db.execute(select(models.Task).where(owned))
+    db_task = result.scalar_one_or_none()
+
+    if db_task is None:
+        raise await _write_miss_error(db, task_id, "update")
+
+    await db.commit()
+    return db_task
 
 
 @router.put("/{task_id}", response_model=schemas.TaskResponse)
@@ -83,25 +167,24 @@ async def update_task(
     db: AsyncSession = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user),
 ):
-    # Find the task and ensure it belongs to the current user
-    result = await db.execute(select(models.Task).where(models.Task.id == task_id))
-    db_task = result.scalar_one_or_none()
-
-    if not db_task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    if db_task.user_id != current_user.id:
-        raise HTTPException(
-            status_code=403, detail="Not authorized to update this task"
-        )
+    return await _update_owned_task(
+        db, task_id, current_user.id, task.model_dump(exclude_unset=True)
+    )
 
-    # Apply updates
-    for key, value in task.model_dump(exclude_unset=True).items():
-        setattr(db_task, key, value)
 
-    await db.commit()
-    await db.refresh(db_task)
-    return db_task
+@router.patch("/{task_id}", response_model=schemas.TaskResponse)
+async def patch_task(
+    task_id: int,
+    task: schemas.TaskPatch,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Update only the supplied fields of a task.
+    """
+    return await _update_owned_task(
+        db, task_id, current_user.id, task.model_dump(exclude_unset=True)
+    )
 
 
 @router.delete("/{task_id}")
@@ -110,18 +193,14 @@ async def delete_task(
     db: AsyncSession = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user),
 ):
-    # Find the task and ensure it belongs to the current user
-    result = await db.execute(select(models.Task).where(models.Task.id == task_id))
-    db_task = result.scalar_one_or_none()
-
-    if not db_task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    if db_task.user_id != current_user.id:
-        raise HTTPException(
-            status_code=403, detail="Not authorized to delete this task"
-        )
+    # Delete only if the task belongs to the current user
+    result = await db.execute(
+        delete(models.Task)
+        .where(models.Task.id == task_id, models.Task.user_id == current_user.id)
+        .returning(models.Task.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise await _write_miss_error(db, task_id, "delete")
 
-    await db.delete(db_task)
     await db.commit()
     return {"detail": "Task deleted"}
@@ -9,9 +9,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models import User
 from app.schemas.auth import CurrentUser, TokenResponse, UserResponse
-from app.utils import hash_password, verify_password
 from app.utils.auth import create_access_token, get_current_user
+from app.utils.hashing import password_hasher
 from app.utils.logging import get_logger
+from app.utils.user_cache import get_user_profile
 
 router = APIRouter()
 logger = get_logger("auth_v2")
@@ -41,7 +42,8 @@ async def register_v2(
         )
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    user = User(email=email, name=name, hashed_password=hash_password(password))
+    hashed_password = await password_hasher.hash(password)
+    user = User(email=email, name=name, hashed_password=hashed_password)
     db.add(user)
     await db.commit()
     await db.refresh(user)
@@ -76,7 +78,7 @@ async def login_v2(
     if (
         not user
         or not user.hashed_password
-        or not verify_password(password, user.hashed_password)
+        or not await password_hasher.verify(password, user.hashed_password)
     ):
         logger.warning("Login failed - invalid credentials", extra={"email": username})
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -104,11 +106,10 @@ async def get_me_v2(
     """
     logger.info("User profile request", extra={"user_id": current_user.id})
 
-    result = await db.execute(select(User).where(User.id == current_user.id))
-    user = result.scalar_one_or_none()
+    profile = await get_user_profile(db, current_user.id)
 
-    if not user:
+    if not profile:
         logger.warning("User not found", extra={"user_id": current_user.id})
         raise HTTPException(status_code=404, detail="User not found")
 
-    return UserResponse.model_validate(user)
+    return profile
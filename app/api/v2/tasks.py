@@ -2,91 +2,208 @@
 Enhanced tasks API v2 with additional features
 """
 
-from datetime import datetime, timedelta
-from typing import Optional
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import and_, func, or_, select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import ColumnElement, delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models
+from app.config import settings
 from app.database import get_db
 from app.schemas.auth import CurrentUser
-from app.schemas.task import PaginatedTaskResponse
+from app.schemas.task import (
+    BulkItemError,
+    BulkTaskCreate,
+    BulkTaskCreateResponse,
+    BulkWriteResponse,
+    PaginatedTaskResponse,
+    TaskCreate,
+    TaskImportResponse,
+    TaskPatch,
+)
 from app.utils.auth import get_current_user
+from app.utils.etag import fetch_conditional_task_page
+from app.utils.export import EXPORT_MEDIA_TYPES, ExportFormat, stream_tasks
+from app.utils.importer import ImportFormat, ImportResult, import_tasks
 from app.utils.logging import get_logger
+from app.utils.pagination import TASK_ORDER, CountMode, count_tasks
+from app.utils.search import search_condition, search_rank
 
 router = APIRouter()
 logger = get_logger("tasks_v2")
 
 
-@router.get("/", response_model=PaginatedTaskResponse)
-async def read_tasks_v2(
-    skip: int = Query(0, ge=0, description="Number of tasks to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Number of tasks to return"),
+@dataclass
+class TaskFilters:
+    """Filters shared by the listing, bulk write and export endpoints"""
+
+    completed: Optional[bool] = None
+    search: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+    def to_log(self) -> Dict[str, Any]:
+        return {
+            "completed": self.completed,
+            "search": self.search,
+            "created_after": (
+                self.created_after.isoformat() if self.created_after else None
+            ),
+            "created_before": (
+                self.created_before.isoformat() if self.created_before else None
+            ),
+        }
+
+    def conditions(self, db: AsyncSession, user_id: int) -> List[ColumnElement[bool]]:
+        """WHERE clauses for the user's tasks matching these filters"""
+        conditions = [models.Task.user_id == user_id]
+
+        if self.completed is not None:
+            conditions.append(models.Task.completed == self.completed)
+
+        if self.search:
+            conditions.append(search_condition(db.get_bind().dialect.name, self.search))
+
+        if self.created_after:
+            conditions.append(models.Task.created_at >= self.created_after)
+
+        if self.created_before:
+            conditions.append(models.Task.created_at < self.created_before)
+
+        return conditions
+
+
+def task_filters(
     completed: Optional[bool] = Query(None, description="Filter by completion status"),
     search: Optional[str] = Query(None, description="Search in title and description"),
     created_after: Optional[datetime] = Query(
         None, description="Filter tasks created after this date"
     ),
+    created_before: Optional[datetime] = Query(
+        None, description="Filter tasks created before this date"
+    ),
+) -> TaskFilters:
+    return TaskFilters(
+        completed=completed,
+        search=search,
+        created_after=created_after,
+        created_before=created_before,
+    )
+
+
+@router.get("/", response_model=PaginatedTaskResponse)
+async def read_tasks_v2(
+    response: Response,
+    skip: int = Query(0, ge=0, description="Number of tasks to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of tasks to return"),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from a previous page's next_cursor"
+    ),
+    count: CountMode = Query(
+        "exact",
+        description="How to compute total: exact, window, estimate or none",
+    ),
+    sort: Literal["created_at", "relevance"] = Query(
+        "created_at", description="Order by creation date or search relevance"
+    ),
+    filters: TaskFilters = Depends(task_filters),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Enhanced task listing with advanced filtering and search.
+
+    Responses carry a weak ETag; send it back in `If-None-Match` to get
+    304 Not Modified while the listing is unchanged.
     """
+    params = {
+        "skip": skip,
+        "limit": limit,
+        "cursor": cursor,
+        "count": count,
+        "sort": sort,
+        **filters.to_log(),
+    }
     logger.info(
         "Fetching tasks with filters",
-        extra={
-            "user_id": current_user.id,
-            "filters": {
-                "skip": skip,
-                "limit": limit,
-                "completed": completed,
-                "search": search,
-                "created_after": created_after.isoformat() if created_after else None,
-            },
-        },
+        extra={"user_id": current_user.id, "filters": params},
     )
 
-    # Build query conditions
-    conditions = [models.Task.user_id == current_user.id]
-
-    if completed is not None:
-        conditions.append(models.Task.completed == completed)
+    conditions = filters.conditions(db, current_user.id)
 
-    if search:
-        search_condition = or_(
-            models.Task.title.ilike(f"%{search}%"),
-            models.Task.description.ilike(f"%{search}%"),
+    order_by = None
+    if filters.search and sort == "relevance":
+        order_by = (
+            search_rank(db.get_bind().dialect.name, filters.search).desc(),
+            *TASK_ORDER,
         )
-        conditions.append(search_condition)
 
-    if created_after:
-        conditions.append(models.Task.created_at >= created_after)
-
-    # Count total tasks
-    count_result = await db.execute(
-        select(func.count(models.Task.id)).where(and_(*conditions))
+    page = await fetch_conditional_task_page(
+        db,
+        response,
+        if_none_match,
+        conditions,
+        {"user_id": current_user.id, **params},
+        count=count,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        order_by=order_by,
     )
-    total = count_result.scalar_one()
+    if isinstance(page, Response):
+        return page
 
-    # Fetch paginated tasks
-    result = await db.execute(
-        select(models.Task)
-        .where(and_(*conditions))
-        .order_by(models.Task.created_at.desc())
-        .offset(skip)
-        .limit(limit)
+    logger.info(
+        "Tasks fetched successfully",
+        extra={
+            "user_id": current_user.id,
+            "total": page["total"],
+            "returned": len(page["tasks"]),
+        },
     )
-    tasks = result.scalars().all()
 
+    return page
+
+
+@router.get("/export")
+async def export_tasks(
+    format: ExportFormat = Query("ndjson", description="Export as ndjson or csv"),
+    filters: TaskFilters = Depends(task_filters),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Stream every task matching the filters as NDJSON or CSV.
+    """
     logger.info(
-        "Tasks fetched successfully",
-        extra={"user_id": current_user.id, "total": total, "returned": len(tasks)},
+        "Exporting tasks",
+        extra={
+            "user_id": current_user.id,
+            "format": format,
+            "filters": filters.to_log(),
+        },
     )
 
-    return {"tasks": tasks, "total": total, "skip": skip, "limit": limit}
+    # The generator keeps using the request's session: FastAPI 0.118+ only
+    # closes it once the response body has been sent
+    return StreamingResponse(
+        stream_tasks(
+            db,
+            filters.conditions(db, current_user.id),
+            format,
+            settings.export_chunk_size,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="tasks.{format}"',
+        },
+    )
 
 
 @router.get("/stats", response_model=dict)
@@ -99,31 +216,26 @@ async def get_task_stats(
     """
     logger.info("Fetching task statistics", extra={"user_id": current_user.id})
 
-    # Total tasks
-    total_result = await db.execute(
-        select(func.count(models.Task.id)).where(models.Task.user_id == current_user.id)
-    )
-    total_tasks = total_result.scalar_one()
-
-    # Completed tasks
-    completed_result = await db.execute(
-        select(func.count(models.Task.id)).where(
-            and_(models.Task.user_id == current_user.id, models.Task.completed)
+    # Counters are maintained by triggers on the tasks table, so this is a
+    # primary-key lookup plus a 7-row range scan regardless of task volume
+    week_start = datetime.now(timezone.utc).date() - timedelta(days=6)
+    weekly_created = (
+        select(func.coalesce(func.sum(models.UserTaskDailyCount.created_count), 0))
+        .where(
+            models.UserTaskDailyCount.user_id == current_user.id,
+            models.UserTaskDailyCount.day >= week_start,
         )
+        .scalar_subquery()
     )
-    completed_tasks = completed_result.scalar_one()
-
-    # Tasks created this week
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    weekly_result = await db.execute(
-        select(func.count(models.Task.id)).where(
-            and_(
-                models.Task.user_id == current_user.id,
-                models.Task.created_at >= week_ago,
-            )
-        )
+    result = await db.execute(
+        select(
+            models.UserTaskStats.total_tasks,
+            models.UserTaskStats.completed_tasks,
+            weekly_created,
+        ).where(models.UserTaskStats.user_id == current_user.id)
     )
-    weekly_tasks = weekly_result.scalar_one()
+    row = result.first()
+    total_tasks, completed_tasks, weekly_tasks = row if row else (0, 0, 0)
 
     stats = {
         "total_tasks": total_tasks,
@@ -140,3 +252,210 @@ async def get_task_stats(
     )
 
     return stats
+
+
+@router.post("/bulk", response_model=BulkTaskCreateResponse)
+async def create_tasks_bulk(
+    payload: BulkTaskCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Create many tasks with a single multi-row INSERT ... RETURNING.
+
+    Each item is validated on its own. With all_or_nothing (the default) any
+    invalid item rejects the whole request; otherwise valid items are created
+    and the invalid ones are reported back by index.
+    """
+    if len(payload.items) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many items, the maximum is {settings.bulk_max_items}",
+        )
+
+    rows = []
+    errors = []
+    for index, item in enumerate(payload.items):
+        try:
+            task = TaskCreate.model_validate(item)
+        except ValidationError as e:
+            errors.append(
+                BulkItemError(
+                    index=index,
+                    errors=e.errors(include_url=False, include_context=False),
+                )
+            )
+            continue
+        rows.append({**task.model_dump(), "user_id": current_user.id})
+
+    if errors and payload.all_or_nothing:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "message": "Bulk task validation failed",
+                "errors": [error.model_dump() for error in errors],
+            },
+        )
+
+    created = []
+    if rows:
+        result = await db.scalars(
+            insert(models.Task).returning(models.Task, sort_by_parameter_order=True),
+            rows,
+        )
+        created = list(result.all())
+        await db.commit()
+
+    logger.info(
+        "Bulk tasks created",
+        extra={
+            "user_id": current_user.id,
+            "created_count": len(created),
+            "rejected_count": len(errors),
+        },
+    )
+
+    return {"created": created, "errors": errors}
+
+
+@router.post("/import", response_model=TaskImportResponse)
+async def import_tasks_stream(
+    request: Request,
+    format: ImportFormat = Query("ndjson", description="Body is ndjson or csv"),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Import tasks from an NDJSON or CSV request body.
+
+    The body is parsed as it arrives and written in batches; invalid rows are
+    skipped and reported back by their record index.
+    """
+
+    def log_progress(result: ImportResult) -> None:
+        logger.info(
+            "Task import progress",
+            extra={
+                "user_id": current_user.id,
+                "imported": result.imported,
+                "rejected": result.rejected,
+            },
+        )
+
+    result = await import_tasks(
+        db,
+        request.stream(),
+        format,
+        user_id=current_user.id,
+        batch_size=settings.import_batch_size,
+        max_errors=settings.import_max_errors,
+        on_progress=log_progress,
+    )
+
+    logger.info(
+        "Tasks imported",
+        extra={
+            "user_id": current_user.id,
+            "format": format,
+            "imported": result.imported,
+            "rejected": result.rejected,
+        },
+    )
+
+    return result
+
+
+async def _run_bulk_write(
+    db: AsyncSession,
+    statement: Any,
+    conditions: List[ColumnElement[bool]],
+    dry_run: bool,
+) -> Dict[str, Any]:
+    """
+    Run a set-based UPDATE/DELETE over the tasks matching the conditions.
+
+    The statement only targets up to bulk_max_affected + 1 rows, so a filter
+    that matches too much is rolled back after bounded work.
+    """
+    if dry_run:
+        return {"affected": await count_tasks(db, conditions), "dry_run": True}
+
+    cap = settings.bulk_max_affected
+    matched_ids = select(models.Task.id).where(*conditions).limit(cap + 1)
+    result = await db.execute(
+        statement.where(models.Task.id.in_(matched_ids)).execution_options(
+            synchronize_session=False
+        )
+    )
+    if result.rowcount > cap:
+        await db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail=f"Filters match more than {cap} tasks, narrow them down",
+        )
+
+    await db.commit()
+    return {"affected": result.rowcount, "dry_run": False}
+
+
+@router.patch("/", response_model=BulkWriteResponse)
+async def update_tasks_by_filter(
+    task: TaskPatch,
+    dry_run: bool = Query(False, description="Only report how many tasks match"),
+    filters: TaskFilters = Depends(task_filters),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Apply the same partial update to every task matching the filters.
+    """
+    values = task.model_dump(exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="No fields to update")
+
+    result = await _run_bulk_write(
+        db,
+        update(models.Task).values(**values),
+        filters.conditions(db, current_user.id),
+        dry_run,
+    )
+
+    logger.info(
+        "Tasks updated by filter",
+        extra={
+            "user_id": current_user.id,
+            "filters": filters.to_log(),
+            "affected": result["affected"],
+            "dry_run": dry_run,
+        },
+    )
+    return result
+
+
+@router.delete("/", response_model=BulkWriteResponse)
+async def delete_tasks_by_filter(
+    dry_run: bool = Query(False, description="Only report how many tasks match"),
+    filters: TaskFilters = Depends(task_filters),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Delete every task matching the filters.
+    """
+    result = await _run_bulk_write(
+        db,
+        delete(models.Task),
+        filters.conditions(db, current_user.id),
+        dry_run,
+    )
+
+    logger.info(
+        "Tasks deleted by filter",
+        extra={
+            "user_id": current_user.id,
+            "filters": filters.to_log(),
+            "affected": result["affected"],
+            "dry_run": dry_run,
+        },
+    )
+    return result
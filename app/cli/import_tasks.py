@@ -0,0 +1,103 @@
+"""
+Import tasks for a user from an NDJSON or CSV file.
+
+Usage:
+    python -m app.cli.import_tasks --user-email user@example.com tasks.ndjson
+    python -m app.cli.import_tasks --user-email user@example.com --format csv -
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator, BinaryIO, Optional
+
+from sqlalchemy import select
+
+from app import models
+from app.config import settings
+from app.database import async_session_maker, engine
+from app.utils.importer import ImportResult, import_tasks
+from app.utils.metrics import mark_process_dead
+
+READ_SIZE = 64 * 1024
+
+
+async def _read_chunks(stream: BinaryIO) -> AsyncIterator[bytes]:
+    while chunk := await asyncio.to_thread(stream.read, READ_SIZE):
+        yield chunk
+
+
+def _print_progress(result: ImportResult) -> None:
+    print(
+        f"\rimported {result.imported}, rejected {result.rejected}",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+async def run(
+    path: str, import_format: str, user_email: str, batch_size: int
+) -> Optional[ImportResult]:
+    async with async_session_maker() as db:
+        user_id = await db.scalar(
+            select(models.User.id).where(models.User.email == user_email)
+        )
+        if user_id is None:
+            print(f"No user with email {user_email}", file=sys.stderr)
+            return None
+
+        stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+        try:
+            result = await import_tasks(
+                db,
+                _read_chunks(stream),
+                import_format,
+                user_id=user_id,
+                batch_size=batch_size,
+                max_errors=settings.import_max_errors,
+                on_progress=_print_progress,
+            )
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+    await engine.dispose()
+    print(file=sys.stderr)
+    for error in result.errors:
+        print(f"record {error.index}: {error.errors}", file=sys.stderr)
+    print(f"imported {result.imported}, rejected {result.rejected}")
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("path", help="File to import, or - for stdin")
+    parser.add_argument("--user-email", required=True, help="Owner of the tasks")
+    parser.add_argument(
+        "--format",
+        choices=["ndjson", "csv"],
+        help="Input format (default: from the file extension, else ndjson)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.import_batch_size,
+        help="Rows written per COPY/INSERT",
+    )
+    args = parser.parse_args()
+
+    import_format = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    try:
+        result = asyncio.run(
+            run(args.path, import_format, args.user_email, args.batch_size)
+        )
+    finally:
+        # Run with PROMETHEUS_MULTIPROC_DIR set, the CLI must not leave its
+        # live gauges in the workers' sums
+        mark_process_dead()
+    return 0 if result is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,6 @@
 # app/config.py
+from typing import Dict
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,10 +8,31 @@ class Settings(BaseSettings):
     database_url: str
     test_database_url: str | None = None
 
+    # Database engine / connection pool
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds before a connection is replaced
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100  # asyncpg prepared statements (0 = off)
+    db_echo: bool = False
+    db_slow_query_threshold: float = 0.5  # seconds; slower statements are logged
+    db_slow_query_explain: bool = False  # EXPLAIN ANALYZE sampled slow SELECTs
+    db_slow_query_explain_sample_rate: float = 0.1
+
     # JWT / security
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    jwt_backend: str = "jose"  # jose, or hmac for a faster HS256/384/512 check
+    token_cache_size: int = 10000  # verified tokens kept in memory (0 = off)
+    user_cache_ttl: float = 60  # seconds a cached user profile is served (0 = off)
+    user_cache_size: int = 10000  # user profiles kept in memory
+
+    # Password hashing (bcrypt runs off the event loop)
+    password_hash_executor: str = "thread"  # thread or process
+    password_hash_workers: int = 4
+    password_hash_queue_size: int = 64  # pending jobs allowed beyond the workers
 
     watchfiles_ignore: str = "output/postgres_data"
     testing: bool = False
@@ -17,17 +40,48 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"
     log_format: str = "json"  # json or text
+    log_dir: str = "logs"
+    log_queue_size: int = 10000  # records buffered for the writer thread
+    log_queue_policy: str = "drop"  # drop or block when the queue is full
+    log_rotation: str = "size"  # size or time
+    log_max_bytes: int = 10 * 1024 * 1024  # size rotation threshold
+    log_rotation_when: str = "midnight"  # time rotation interval
+    log_backup_count: int = 7  # rotated files kept per log
+    log_compress: bool = True  # gzip rotated files
+    log_file_per_process: bool = False  # app.<pid>.log etc., for several workers
+    # Fraction of INFO records kept, by logger ("app.requests") or by logger and
+    # message ("app.tasks_v2:Tasks fetched successfully"); JSON in the env
+    log_sample_rates: Dict[str, float] = {}
+    log_slow_request_threshold: float = 1.0  # seconds; slower requests always log
+    log_dedup_interval: float = 60  # seconds between repeated warnings (0 = off)
+
+    # Bulk operations
+    bulk_max_items: int = 1000  # items accepted by POST /api/v2/tasks/bulk
+    bulk_max_affected: int = 10000  # rows a filtered PATCH/DELETE may touch
+    export_chunk_size: int = 1000  # rows fetched and serialized per export chunk
+    import_batch_size: int = 5000  # rows written per COPY/INSERT during imports
+    import_max_errors: int = 100  # rejected rows reported in detail per import
 
     # Rate limiting
     rate_limit_calls: int = 100
     rate_limit_period: int = 3600  # seconds
+    rate_limit_user_calls: int = 1000  # per authenticated user
+    rate_limit_user_period: int = 3600  # seconds
+    rate_limit_backend: str = "memory"  # memory, redis or shm
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
+    rate_limit_shm_path: str = "/dev/shm/task_api_rate_limit"  # shared by workers
+    rate_limit_shm_slots: int = 65536  # keys tracked by the shm backend
+    rate_limit_memory_max_keys: int = 1_000_000  # keys kept by the memory backend
+    rate_limit_sweep_interval: int = 60  # seconds between expired key sweeps
 
     # Monitoring
     enable_metrics: bool = True
+    server_timing: bool = True  # Server-Timing header with DB time per request
     metrics_path: str = "/metrics"
 
     # Health checks
-    health_check_interval: int = 30  # seconds
+    health_check_interval: int = 30  # seconds between background samples
+    health_check_timeout: float = 5  # seconds before a single check fails
 
     # Modern configuration (Pydantic v2)
     model_config = SettingsConfigDict(
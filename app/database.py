@@ -1,7 +1,21 @@
 # app/database.py
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
 
 from app.config import settings
+from app.utils.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_QUERY_DURATION,
+)
+from app.utils.query_stats import record_query
+from app.utils.slow_queries import slow_query_log
 
 
 def get_database_url():
@@ -14,7 +28,113 @@ def get_database_url():
 
 DATABASE_URL = get_database_url()
 
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+
+class PoolMetrics:
+    """Checkout wait time and timeout counters shared by the engine pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long checkouts wait for a connection"""
+
+    def connect(self) -> PoolProxiedConnection:
+        start_time = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_metrics.checkout_timeouts += 1
+            DB_POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        wait = time.perf_counter() - start_time
+        pool_metrics.record(wait)
+        DB_POOL_CHECKOUT_WAIT.observe(wait)
+        return connection
+
+
+def get_engine_options(url: str) -> Dict[str, Any]:
+    """Engine keyword arguments built from settings"""
+    options: Dict[str, Any] = {"echo": settings.db_echo}
+    database_url = make_url(url)
+    if database_url.get_backend_name() == "sqlite":
+        # SQLAlchemy picks the SQLite pool, e.g. a single shared connection for
+        # :memory:, where each pooled connection would get its own database
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    if database_url.get_driver_name() == "asyncpg":
+        # Server-side prepared statements (asyncpg) and SQLAlchemy's cache of them
+        options["connect_args"] = {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        }
+    return options
+
+
+engine = create_async_engine(DATABASE_URL, **get_engine_options(DATABASE_URL))
+
+
+def _statement_operation(statement: str) -> str:
+    words = statement.split(None, 1)
+    operation = words[0].lower() if words else ""
+    if operation in ("select", "insert", "update", "delete", "with"):
+        return operation
+    return "other"
+
+
+# Registered on the Engine class, so statements of every engine are counted
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    DB_QUERY_DURATION.labels(_statement_operation(statement)).observe(elapsed)
+    record_query(statement, elapsed)
+    slow_query_log.observe(conn, statement, parameters, executemany, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # after_cursor_execute does not run for failed statements
+    start_times = (
+        context.connection.info.get("query_start_time") if context.connection else None
+    )
+    if start_times:
+        start_times.pop()
+
+
+@event.listens_for(engine.sync_engine.pool, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKED_OUT.inc()
+
+
+@event.listens_for(engine.sync_engine.pool, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    DB_POOL_CHECKED_OUT.dec()
+
+
 async_session_maker = async_sessionmaker(
     bind=engine,
     expire_on_commit=False,
@@ -24,6 +144,35 @@ async_session_maker = async_sessionmaker(
 )
 
 
+def get_pool_stats() -> Dict[str, Any]:
+    """Snapshot of the engine connection pool"""
+    pool = engine.pool
+    stats: Dict[str, Any] = {
+        "checkouts": pool_metrics.checkouts,
+        "checkout_timeouts": pool_metrics.checkout_timeouts,
+        "avg_wait_ms": round(
+            (
+                pool_metrics.total_wait / pool_metrics.checkouts * 1000
+                if pool_metrics.checkouts
+                else 0
+            ),
+            2,
+        ),
+        "max_wait_ms": round(pool_metrics.max_wait * 1000, 2),
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": pool._max_overflow,
+            }
+        )
+    return stats
+
+
 async def get_db():
     async with async_session_maker() as session:
         yield session
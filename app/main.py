@@ -1,26 +1,59 @@
 # app/main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import api_router
+from app.api.health import get_metrics
 from app.api.health import router as health_router
+from app.config import settings
+from app.utils.hashing import password_hasher
+from app.utils.health_sampler import health_sampler
 from app.utils.logging import LoggingMiddleware, setup_logging
-from app.utils.rate_limiting import RateLimitMiddleware
+from app.utils.metrics import MetricsMiddleware, mark_process_dead
+from app.utils.rate_limiting import RateLimitMiddleware, rate_limiter
 
 # Setup logging first
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await rate_limiter.start()
+    await health_sampler.start()
+    yield
+    await health_sampler.close()
+    password_hasher.shutdown()
+    await rate_limiter.close()
+    mark_process_dead()
+
+
 app = FastAPI(
     title="Task API",
     version="1.0",
     description="A modern task management API with advanced features",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Add middleware
 app.add_middleware(LoggingMiddleware)
-app.add_middleware(RateLimitMiddleware, calls=100, period=3600)
+app.add_middleware(
+    RateLimitMiddleware,
+    calls=settings.rate_limit_calls,
+    period=settings.rate_limit_period,
+    user_calls=settings.rate_limit_user_calls,
+    user_period=settings.rate_limit_user_period,
+    exempt_paths=("/health", settings.metrics_path),
+)
+if settings.enable_metrics:
+    # Outside the rate limiter, so rejected requests are counted too
+    app.add_middleware(
+        MetricsMiddleware,
+        exclude_paths=(settings.metrics_path, "/health/metrics"),
+    )
 
 # CORS Middleware
 app.add_middleware(
@@ -32,12 +65,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Response headers browser clients may read
+    expose_headers=[
+        "ETag",
+        "X-RateLimit-Limit",
+        "X-RateLimit-Remaining",
+        "X-RateLimit-Reset",
+        "Retry-After",
+        "X-Request-ID",
+        "Server-Timing",
+    ],
 )
 
 # Include routers
 app.include_router(api_router, prefix="/api")
 app.include_router(health_router, prefix="/health", tags=["health"])
 
+if settings.enable_metrics:
+    app.add_api_route(settings.metrics_path, get_metrics, include_in_schema=False)
+
 
 @app.get("/")
 def read_root():
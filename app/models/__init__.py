@@ -5,6 +5,8 @@ Models package - SQLAlchemy database models
 # Import Base first
 from .base import Base
 from .task import Task
+from .task_search import tasks_fts
+from .task_stats import UserTaskDailyCount, UserTaskStats
 from .user import User
 
 # Import models in the correct order to avoid relationship problems
@@ -18,4 +20,12 @@ def configure_mappers():
     configure_mappers()
 
 
-__all__ = ["Base", "User", "Task", "configure_mappers"]
+__all__ = [
+    "Base",
+    "User",
+    "Task",
+    "tasks_fts",
+    "UserTaskStats",
+    "UserTaskDailyCount",
+    "configure_mappers",
+]
@@ -0,0 +1,85 @@
+# app/models/task_search.py
+"""
+Full-text search structures for tasks.
+
+These live outside the ORM mapping because they are database specific:
+- PostgreSQL: a generated `search_vector` tsvector column with a GIN index.
+- SQLite: an external-content FTS5 table kept in sync by triggers.
+"""
+
+from sqlalchemy import DDL, event
+from sqlalchemy.sql import column, table
+
+from .base import Base
+from .task import Task
+
+# Text search configuration used for both indexing and querying
+SEARCH_CONFIG = "english"
+
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_VECTOR_INDEX = "ix_tasks_search_vector"
+FTS_TABLE = "tasks_fts"
+
+# Lightweight handle on the SQLite FTS5 table for query building
+tasks_fts = table(FTS_TABLE, column("rowid"), column("title"), column("description"))
+
+PG_SEARCH_DDL = [
+    f"""
+    ALTER TABLE tasks ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR_COLUMN} tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    f"""
+    CREATE INDEX IF NOT EXISTS {SEARCH_VECTOR_INDEX}
+    ON tasks USING GIN ({SEARCH_VECTOR_COLUMN})
+    """,
+]
+
+SQLITE_SEARCH_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='tasks', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_after_insert AFTER INSERT ON tasks
+    BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, description)
+        VALUES (NEW.id, NEW.title, NEW.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_after_delete AFTER DELETE ON tasks
+    BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_after_update
+    AFTER UPDATE OF title, description ON tasks
+    BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description);
+        INSERT INTO {FTS_TABLE} (rowid, title, description)
+        VALUES (NEW.id, NEW.title, NEW.description);
+    END
+    """,
+]
+
+for _statement in PG_SEARCH_DDL:
+    event.listen(
+        Task.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql")
+    )
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(
+        Task.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Base.metadata,
+    "after_drop",
+    DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"),
+)
@@ -0,0 +1,156 @@
+# app/models/task_stats.py
+from datetime import date
+
+from sqlalchemy import DDL, Date, ForeignKey, Integer, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class UserTaskStats(Base):
+    """Per-user task counters, maintained by triggers on the tasks table"""
+
+    __tablename__ = "user_task_stats"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    total_tasks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed_tasks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class UserTaskDailyCount(Base):
+    """Number of tasks per user bucketed by creation day (UTC)"""
+
+    __tablename__ = "user_task_daily_counts"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    created_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# --- Triggers keeping the counters in sync ---
+#
+# PostgreSQL uses statement-level triggers with transition tables, so bulk
+# INSERT/UPDATE/DELETE and COPY pay one aggregate upsert per statement instead
+# of one per row. SQLite (tests) only supports row-level triggers. The same
+# statements are run by create_all and by the migration that adds the tables.
+
+
+def _pg_apply_delta(delta_rows: str) -> str:
+    return f"""
+    WITH delta AS ({delta_rows}),
+    totals AS (
+        INSERT INTO user_task_stats AS s (user_id, total_tasks, completed_tasks)
+        SELECT user_id, sum(sign),
+               sum(CASE WHEN coalesce(completed, false) THEN sign ELSE 0 END)
+        FROM delta
+        GROUP BY user_id
+        HAVING sum(sign) <> 0
+            OR sum(CASE WHEN coalesce(completed, false) THEN sign ELSE 0 END) <> 0
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_tasks = s.total_tasks + EXCLUDED.total_tasks,
+            completed_tasks = s.completed_tasks + EXCLUDED.completed_tasks
+    )
+    INSERT INTO user_task_daily_counts AS d (user_id, day, created_count)
+    SELECT user_id, (created_at AT TIME ZONE 'UTC')::date, sum(sign)
+    FROM delta
+    GROUP BY 1, 2
+    HAVING sum(sign) <> 0
+    ON CONFLICT (user_id, day) DO UPDATE SET
+        created_count = d.created_count + EXCLUDED.created_count;
+    """
+
+
+_PG_DELTAS = {
+    "insert": ("NEW TABLE AS new_rows", "SELECT *, 1 AS sign FROM new_rows"),
+    "delete": ("OLD TABLE AS old_rows", "SELECT *, -1 AS sign FROM old_rows"),
+    "update": (
+        "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+        "SELECT *, -1 AS sign FROM old_rows UNION ALL "
+        "SELECT *, 1 AS sign FROM new_rows",
+    ),
+}
+
+PG_TASK_STATS_DDL: list[str] = []
+for _op, (_referencing, _delta) in _PG_DELTAS.items():
+    PG_TASK_STATS_DDL += [
+        f"""
+        CREATE OR REPLACE FUNCTION task_stats_after_{_op}() RETURNS trigger AS $$
+        BEGIN
+            {_pg_apply_delta(_delta)}
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        f"DROP TRIGGER IF EXISTS task_stats_after_{_op} ON tasks",
+        f"""
+        CREATE TRIGGER task_stats_after_{_op}
+        AFTER {_op.upper()} ON tasks
+        REFERENCING {_referencing}
+        FOR EACH STATEMENT EXECUTE FUNCTION task_stats_after_{_op}()
+        """,
+    ]
+
+PG_TASK_STATS_DROP_DDL = [
+    f"DROP FUNCTION IF EXISTS task_stats_after_{_op}() CASCADE" for _op in _PG_DELTAS
+]
+
+
+def _sqlite_apply_row(row: str, sign: int) -> str:
+    return f"""
+        INSERT OR IGNORE INTO user_task_stats (user_id, total_tasks, completed_tasks)
+        VALUES ({row}.user_id, 0, 0);
+        UPDATE user_task_stats
+        SET total_tasks = total_tasks + ({sign}),
+            completed_tasks = completed_tasks + ({sign}) * coalesce({row}.completed, 0)
+        WHERE user_id = {row}.user_id;
+        INSERT OR IGNORE INTO user_task_daily_counts (user_id, day, created_count)
+        VALUES ({row}.user_id, date({row}.created_at), 0);
+        UPDATE user_task_daily_counts
+        SET created_count = created_count + ({sign})
+        WHERE user_id = {row}.user_id AND day = date({row}.created_at);
+    """
+
+
+SQLITE_TASK_STATS_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_stats_after_insert AFTER INSERT ON tasks
+    BEGIN {_sqlite_apply_row("NEW", 1)} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_stats_after_delete AFTER DELETE ON tasks
+    BEGIN {_sqlite_apply_row("OLD", -1)} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_stats_after_update AFTER UPDATE ON tasks
+    WHEN OLD.completed IS NOT NEW.completed
+        OR OLD.user_id IS NOT NEW.user_id
+        OR OLD.created_at IS NOT NEW.created_at
+    BEGIN {_sqlite_apply_row("OLD", -1)} {_sqlite_apply_row("NEW", 1)} END
+    """,
+]
+
+SQLITE_TASK_STATS_DROP_DDL = [
+    f"DROP TRIGGER IF EXISTS task_stats_after_{_op}" for _op in _PG_DELTAS
+]
+
+# Statements creating and dropping the triggers, by dialect name
+TASK_STATS_DDL = {"postgresql": PG_TASK_STATS_DDL, "sqlite": SQLITE_TASK_STATS_DDL}
+TASK_STATS_DROP_DDL = {
+    "postgresql": PG_TASK_STATS_DROP_DDL,
+    "sqlite": SQLITE_TASK_STATS_DROP_DDL,
+}
+
+for _dialect, _statements in TASK_STATS_DDL.items():
+    for _statement in _statements:
+        event.listen(
+            Base.metadata, "after_create", DDL(_statement).execute_if(dialect=_dialect)
+        )
+# SQLite drops a table's triggers with it
+for _statement in PG_TASK_STATS_DROP_DDL:
+    event.listen(
+        Base.metadata, "after_drop", DDL(_statement).execute_if(dialect="postgresql")
+    )
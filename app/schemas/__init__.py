@@ -1,13 +1,30 @@
 # app/schemas/__init__.py
 from .auth import AuthStatus, Token, UserBase, UserCreate, UserResponse, UserSession
-from .task import TaskBase, TaskCreate, TaskResponse, TaskUpdate
+from .task import (
+    BulkItemError,
+    BulkTaskCreate,
+    BulkTaskCreateResponse,
+    BulkWriteResponse,
+    TaskBase,
+    TaskCreate,
+    TaskImportResponse,
+    TaskPatch,
+    TaskResponse,
+    TaskUpdate,
+)
 
 __all__ = [
     # Tasks
     "TaskBase",
     "TaskCreate",
     "TaskUpdate",
+    "TaskPatch",
     "TaskResponse",
+    "BulkTaskCreate",
+    "BulkTaskCreateResponse",
+    "BulkItemError",
+    "BulkWriteResponse",
+    "TaskImportResponse",
     # Auth
     "Token",
     "UserBase",
@@ -1,11 +1,14 @@
 # app/schemas/task.py
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+# Length of the tasks.title column
+TITLE_MAX_LENGTH = 100
 
 
 class TaskBase(BaseModel):
-    title: str
+    title: str = Field(max_length=TITLE_MAX_LENGTH)
     description: Optional[str] = None
     completed: bool = False
 
@@ -18,6 +21,21 @@ class TaskUpdate(TaskBase):
     pass
 
 
+class TaskPatch(BaseModel):
+    """Partial update: only the fields sent by the client are changed"""
+
+    title: Optional[str] = Field(None, max_length=TITLE_MAX_LENGTH)
+    description: Optional[str] = None
+    completed: Optional[bool] = None
+
+    @field_validator("title", "completed")
+    @classmethod
+    def not_null(cls, value: Any) -> Any:
+        if value is None:
+            raise ValueError("Field may not be null")
+        return value
+
+
 class TaskResponse(TaskBase):
     model_config = ConfigDict(from_attributes=True)
 
@@ -27,6 +45,36 @@ class TaskResponse(TaskBase):
 
 class PaginatedTaskResponse(BaseModel):
     tasks: List[TaskResponse]
-    total: int
+    total: Optional[int] = None
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+
+class BulkTaskCreate(BaseModel):
+    # Items are validated one by one so errors can be reported per index
+    items: List[Dict[str, Any]]
+    all_or_nothing: bool = True
+
+
+class BulkItemError(BaseModel):
+    index: int
+    errors: List[Dict[str, Any]]
+
+
+class BulkTaskCreateResponse(BaseModel):
+    created: List[TaskResponse]
+    errors: List[BulkItemError]
+
+
+class BulkWriteResponse(BaseModel):
+    affected: int
+    dry_run: bool
+
+
+class TaskImportResponse(BaseModel):
+    imported: int
+    rejected: int
+    # Only the first IMPORT_MAX_ERRORS rejects are listed
+    errors: List[BulkItemError]
@@ -1,10 +1,30 @@
 # app/tests/test_auth.py
 
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
 import pytest
+from fastapi import HTTPException
 from httpx import ASGITransport, AsyncClient
+from jose import jwt
+from sqlalchemy import update
 
+from app.config import settings
 from app.main import app
-from app.utils.auth import create_access_token
+from app.models import User
+from app.schemas.auth import UserResponse
+from app.utils import auth
+from app.utils.auth import (
+    _decode_hmac,
+    _decode_jose,
+    create_access_token,
+    decode_access_token,
+)
+from app.utils.hashing import PasswordHasher
+from app.utils.query_stats import query_budget
+from app.utils.token_cache import TokenCache
+from app.utils.user_cache import UserProfileCache
 
 # @pytest.fixture(autouse=True)
 # async def clean_db(db_session):
@@ -116,3 +136,192 @@ async def test_me_without_token():
         )
     assert response.status_code == 401
     assert "detail" in response.json()
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_roundtrip():
+    hasher = PasswordHasher(max_workers=2, queue_size=2)
+    try:
+        hashed = await hasher.hash("T3stp@ssw0rd.23")
+        assert await hasher.verify("T3stp@ssw0rd.23", hashed)
+        assert not await hasher.verify("Wr0ng-p@ssWd", hashed)
+        stats = hasher.stats()
+        assert stats["completed"] == 3
+        assert stats["in_flight"] == 0
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_saturated():
+    hasher = PasswordHasher(max_workers=1, queue_size=1)
+    try:
+        jobs = [asyncio.ensure_future(hasher.hash("T3stp@ssw0rd.23")) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await hasher.hash("T3stp@ssw0rd.23")
+        assert exc_info.value.status_code == 503
+        assert hasher.stats()["rejected"] == 1
+
+        await asyncio.gather(*jobs)
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_holds_slot_of_cancelled_job():
+    hasher = PasswordHasher(max_workers=1, queue_size=0)
+    release = threading.Event()
+    try:
+        job = asyncio.ensure_future(hasher._run(release.wait))
+        await asyncio.sleep(0.05)
+        job.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await job
+
+        # The abandoned call still occupies the only worker
+        assert hasher.in_flight == 1
+        with pytest.raises(HTTPException):
+            await hasher.hash("T3stp@ssw0rd.23")
+
+        release.set()
+        while hasher.in_flight:
+            await asyncio.sleep(0.01)
+        assert hasher.stats()["completed"] == 0
+    finally:
+        release.set()
+        hasher.shutdown()
+
+
+def test_token_cache_expires_and_evicts():
+    now = [1000.0]
+    cache = TokenCache(max_size=2, clock=lambda: now[0])
+
+    assert cache.get_payload("a") is None
+    cache.put_payload("a", {"sub": "1", "exp": 1010})
+    cache.put_payload("b", {"sub": "2", "exp": 2000})
+    assert cache.get_payload("a") == {"sub": "1", "exp": 1010}
+
+    # "b" is now the least recently used
+    cache.put_payload("c", {"sub": "3", "exp": 2000})
+    assert cache.get_payload("b") is None
+    assert cache.get_payload("c") is not None
+
+    now[0] = 1010
+    assert cache.get_payload("a") is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 3
+
+
+def test_decode_access_token_uses_cache(monkeypatch):
+    cache = TokenCache(max_size=10)
+    monkeypatch.setattr(auth, "token_cache", cache)
+    token = create_access_token(data={"sub": "7"})
+
+    first = decode_access_token(token)
+    first["sub"] = "changed"
+    assert decode_access_token(token)["sub"] == "7"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    assert decode_access_token(token + "x") is None
+    assert len(cache) == 1
+
+
+@pytest.mark.parametrize("algorithm", ["HS256", "HS512"])
+def test_hmac_backend_matches_jose(monkeypatch, algorithm):
+    monkeypatch.setattr(settings, "algorithm", algorithm)
+    now = datetime.now(timezone.utc)
+    valid = jwt.encode(
+        {"sub": "1", "email": "a@b.c", "exp": now + timedelta(minutes=5)},
+        settings.secret_key,
+        algorithm=algorithm,
+    )
+    tokens = [
+        valid,
+        valid[:-2] + ("AA" if not valid.endswith("AA") else "BB"),
+        valid + ".extra",
+        jwt.encode(
+            {"sub": "1", "exp": now - timedelta(minutes=1)}, settings.secret_key
+        ),
+        jwt.encode({"sub": "1"}, "another-secret", algorithm=algorithm),
+        jwt.encode(
+            {"sub": "1", "aud": "other"}, settings.secret_key, algorithm=algorithm
+        ),
+        jwt.encode({"sub": 1}, settings.secret_key, algorithm=algorithm),
+        "not.a.token",
+        "",
+    ]
+    for token in tokens:
+        assert _decode_hmac(token) == _decode_jose(token), token
+    assert _decode_hmac(valid)["email"] == "a@b.c"
+
+
+@pytest.mark.asyncio
+async def test_me_is_cached_until_user_changes(override_get_db, db_session, test_user):
+    token = create_access_token(
+        data={"sub": str(test_user.id), "email": test_user.email}
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        await client.get("/api/v1/auth/me", headers=headers)
+        with query_budget(0):
+            response = await client.get("/api/v2/auth/me", headers=headers)
+        assert response.json()["name"] == test_user.name
+
+        # ORM updates drop the cached profile
+        test_user.name = "Renamed"
+        await db_session.commit()
+        response = await client.get("/api/v1/auth/me", headers=headers)
+        assert response.json()["name"] == "Renamed"
+
+        # So do bulk updates
+        await db_session.execute(
+            update(User).where(User.id == test_user.id).values(name="Bulk renamed")
+        )
+        await db_session.commit()
+        response = await client.get("/api/v1/auth/me", headers=headers)
+        assert response.json()["name"] == "Bulk renamed"
+
+
+def test_user_profile_cache_ttl():
+    now = [1000.0]
+    cache = UserProfileCache(ttl=60, max_size=10, clock=lambda: now[0])
+    cache.put_profile(UserResponse(id=1, email="a@b.c", name="A"))
+
+    profile = cache.get_profile(1)
+    profile.name = "changed"
+    assert cache.get_profile(1).name == "A"
+
+    now[0] = 1060
+    assert cache.get_profile(1) is None
+
+
+def test_user_profile_cache_skips_reads_older_than_invalidation():
+    cache = UserProfileCache(ttl=60, max_size=1)
+    old = UserResponse(id=1, email="a@b.c", name="Old")
+
+    # A read of the old row that finishes after the user was invalidated
+    read_version = cache.version
+    cache.delete(1)
+    cache.put_profile(old, read_version)
+    assert cache.get_profile(1) is None
+
+    # Reads that began afterwards are cached
+    cache.put_profile(old, cache.version)
+    assert cache.get_profile(1).name == "Old"
+
+    # Also after a bulk clear, or once the user's version was forgotten
+    read_version = cache.version
+    cache.clear()
+    cache.put_profile(old, read_version)
+    assert cache.get_profile(1) is None
+
+    read_version = cache.version
+    cache.delete(1)
+    cache.delete(2)
+    cache.put_profile(old, read_version)
+    assert cache.get_profile(1) is None
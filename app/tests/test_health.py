@@ -2,10 +2,27 @@
 Tests for health check endpoints
 """
 
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
 import pytest
+from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
 
+from app.config import settings
+from app.database import InstrumentedQueuePool, get_engine_options
 from app.main import app
+from app.utils import rate_limiting
+from app.utils.health_sampler import HealthSampler
+from app.utils.metrics import MetricsMiddleware
+from app.utils.rate_limit_backends import InMemoryBackend
+from app.utils.rate_limiting import RateLimitMiddleware
 
 
 @pytest.mark.asyncio
@@ -22,6 +39,30 @@ async def test_health_check():
     assert data["service"] == "task-backend"
 
 
+@pytest.mark.asyncio
+async def test_cors_exposes_response_headers():
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get(
+            "/health/health", headers={"Origin": "http://localhost:3000"}
+        )
+
+    exposed = {
+        header.strip().lower()
+        for header in response.headers["access-control-expose-headers"].split(",")
+    }
+    assert {
+        "etag",
+        "x-ratelimit-limit",
+        "x-ratelimit-remaining",
+        "x-ratelimit-reset",
+        "retry-after",
+        "x-request-id",
+        "server-timing",
+    } <= exposed
+
+
 @pytest.mark.asyncio
 async def test_detailed_health_check(override_get_db):
     """Test detailed health check with database dependency"""
@@ -48,8 +89,156 @@ async def test_metrics_endpoint():
         response = await client.get("/health/metrics")
 
     assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE_LATEST
     # Check that it returns Prometheus-style metrics
     content = response.text
     assert "system_cpu_percent" in content
     assert "system_memory_percent" in content
     assert "system_disk_percent" in content
+
+
+@pytest.mark.asyncio
+async def test_detailed_health_reports_pool(override_get_db):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/health/detailed")
+
+    pool = response.json()["checks"]["database"]["pool"]
+    assert "checked_out" in pool
+    assert "overflow" in pool
+    assert "avg_wait_ms" in pool
+    assert "checkout_timeouts" in pool
+
+
+@pytest.mark.asyncio
+async def test_sqlite_keeps_default_pool():
+    assert get_engine_options("postgresql+asyncpg://u@h/db")["poolclass"] is (
+        InstrumentedQueuePool
+    )
+    options = get_engine_options("sqlite+aiosqlite://")
+    assert "poolclass" not in options
+
+    # Every session sees the same in-memory database
+    engine = create_async_engine("sqlite+aiosqlite://", **options)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    async with engine.connect() as first, engine.connect() as second:
+        await first.execute(text("SELECT * FROM t"))
+        await second.execute(text("SELECT * FROM t"))
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_health_sampler_runs_checks_concurrently_with_timeout():
+    async def slow():
+        await asyncio.sleep(10)
+        return {"status": "healthy"}
+
+    async def broken():
+        raise RuntimeError("no connection")
+
+    async def fine():
+        await asyncio.sleep(0.05)
+        return {"status": "healthy"}
+
+    sampler = HealthSampler(
+        {"slow": slow, "broken": broken, "fine": fine, "fine_too": fine},
+        interval=60,
+        timeout=0.2,
+    )
+    start = time.perf_counter()
+    snapshot = await sampler.latest()
+    assert time.perf_counter() - start < 1
+
+    checks = snapshot["checks"]
+    assert checks["slow"]["status"] == "unhealthy"
+    assert "timed out" in checks["slow"]["message"]
+    assert checks["broken"]["status"] == "unhealthy"
+    assert checks["fine"]["status"] == "healthy"
+
+    # Later reads reuse the snapshot instead of probing again
+    assert await sampler.latest() is snapshot
+
+
+@pytest.mark.asyncio
+async def test_metrics_path_serves_prometheus_text():
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        await client.get("/")
+        response = await client.get(settings.metrics_path)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE_LATEST
+    assert 'http_requests_total{method="GET",route="/",status="200"}' in response.text
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert "db_query_duration_seconds" in response.text
+
+
+@pytest.mark.asyncio
+async def test_metrics_middleware_labels_routes_and_rejections(monkeypatch):
+    monkeypatch.setattr(rate_limiting, "rate_limiter", InMemoryBackend())
+    test_app = FastAPI()
+    test_app.add_middleware(RateLimitMiddleware, calls=2, period=60)
+    test_app.add_middleware(MetricsMiddleware)
+
+    @test_app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        return {}
+
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    route = {"method": "GET", "route": "/items/{item_id}"}
+    before_ok = sample("http_requests_total", status="200", **route)
+    before_429 = sample("http_requests_total", status="429", **route)
+    before_rejected = sample("rate_limit_rejections_total", policy="ip")
+    before_latency = sample("http_request_duration_seconds_count", **route)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=test_app), base_url="http://test"
+    ) as client:
+        for item_id in range(3):
+            await client.get(f"/items/{item_id}")
+
+    # Path parameters are folded into the route template, also for requests
+    # rejected before reaching the router
+    assert sample("http_requests_total", status="200", **route) == before_ok + 2
+    assert sample("http_requests_total", status="429", **route) == before_429 + 1
+    assert sample("rate_limit_rejections_total", policy="ip") == before_rejected + 1
+    assert sample("http_request_duration_seconds_count", **route) == before_latency + 3
+    assert sample("http_requests_in_progress", method="GET") == 0
+
+
+MULTIPROCESS_WORKER = """
+from app.utils.metrics import HTTP_REQUESTS, HTTP_REQUESTS_IN_PROGRESS
+HTTP_REQUESTS.labels("GET", "/", "200").inc({count})
+HTTP_REQUESTS_IN_PROGRESS.labels("GET").inc()
+"""
+
+MULTIPROCESS_SCRAPE = """
+from app.utils.metrics import generate_metrics
+print(generate_metrics().decode())
+"""
+
+
+def test_metrics_aggregate_worker_processes(tmp_path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+
+    def run(code):
+        return subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    run(MULTIPROCESS_WORKER.format(count=2))
+    run(MULTIPROCESS_WORKER.format(count=3))
+    output = run(MULTIPROCESS_SCRAPE)
+
+    assert 'http_requests_total{method="GET",route="/",status="200"} 5.0' in output
+    # livesum gauges of exited workers are only dropped by mark_process_dead
+    assert 'http_requests_in_progress{method="GET"} 2.0' in output
@@ -0,0 +1,412 @@
+# app/tests/test_logging.py
+import gzip
+import io
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.utils import formatters
+from app.utils.formatters import JSONFormatter
+from app.utils.log_filters import DedupFilter, SamplingFilter
+from app.utils.logging import (
+    BoundedQueueHandler,
+    DrainingQueueListener,
+    LoggingMiddleware,
+    StdoutHandler,
+    get_logger,
+    setup_logging,
+    shutdown_logging,
+)
+from app.utils.query_stats import query_budget
+from app.utils.slow_queries import redact_parameters, slow_query_log
+
+
+@pytest.mark.asyncio
+async def test_logging_middleware_streams(caplog):
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+    sent = []
+
+    @app.get("/stream")
+    def stream():
+        def chunks():
+            for i in range(3):
+                sent.append(i)
+                yield f"{i}\n"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        with caplog.at_level("INFO", logger="app.requests"):
+            response = await client.get("/stream")
+
+    assert response.status_code == 200
+    assert response.text == "0\n1\n2\n"
+    assert response.headers["X-Request-ID"].startswith("req_")
+    completed = [r for r in caplog.records if r.getMessage() == "Request completed"]
+    assert completed[0].status_code == 200
+
+
+def test_logging_pipeline_rotates_and_compresses(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "log_max_bytes", 2000)
+    monkeypatch.setattr(settings, "log_backup_count", 2)
+    setup_logging(tmp_path)
+    try:
+        logger = get_logger("pipeline_test")
+        for i in range(50):
+            logger.info("Rotating record %d", i, extra={"user_id": i})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Failed")
+    finally:
+        shutdown_logging()
+        # Restore the pipeline configured by app.main
+        setup_logging()
+
+    assert (tmp_path / "app.log.1.gz").exists()
+    assert not (tmp_path / "app.log.3.gz").exists()
+    with gzip.open(tmp_path / "app.log.1.gz", "rt") as f:
+        assert json.loads(f.readline())["message"].startswith("Rotating record")
+
+    error = json.loads((tmp_path / "errors.log").read_text())
+    assert error["message"] == "Failed"
+    assert "ValueError: boom" in error["exception"]
+
+
+def test_logging_pipeline_reports_suppressed_at_shutdown(tmp_path):
+    setup_logging(tmp_path)
+    try:
+        logger = get_logger("dedup_test")
+        for _ in range(3):
+            logger.warning("Repeated warning")
+    finally:
+        shutdown_logging()
+        setup_logging()
+
+    lines = [
+        json.loads(line)["message"]
+        for line in (tmp_path / "app.log").read_text().splitlines()
+    ]
+    assert lines == ["Repeated warning", "Repeated warning (2 similar suppressed)"]
+
+
+def test_stdout_handler_follows_sys_stdout(monkeypatch):
+    handler = StdoutHandler()
+    output = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", output)
+    handler.emit(_record("app.exit", logging.WARNING, "Written at exit"))
+    assert output.getvalue() == "Written at exit\n"
+
+
+def test_listener_stops_with_full_queue():
+    release = threading.Event()
+    handled = []
+
+    class SlowHandler(logging.Handler):
+        def emit(self, record):
+            release.wait()
+            handled.append(record.getMessage())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=1)
+    listener = DrainingQueueListener(log_queue, SlowHandler())
+    listener.start()
+    log_queue.put(_record("app.flood", logging.INFO, "first"))
+    # The listener is busy with the first record once the queue empties
+    while not log_queue.empty():
+        time.sleep(0.01)
+    log_queue.put(_record("app.flood", logging.INFO, "second"))
+    assert log_queue.full()
+
+    threading.Timer(0.1, release.set).start()
+    listener.stop()
+    assert handled == ["first", "second"]
+
+
+LOGGING_WORKER = """
+from app.utils.logging import get_logger, setup_logging, shutdown_logging
+
+setup_logging()
+for i in range({count}):
+    get_logger("worker").info("Worker record %d", i)
+shutdown_logging()
+"""
+
+
+def test_logging_workers_rotate_their_own_files(tmp_path):
+    env = dict(
+        os.environ,
+        LOG_DIR=str(tmp_path),
+        LOG_FILE_PER_PROCESS="true",
+        LOG_MAX_BYTES="20000",
+        LOG_BACKUP_COUNT="1000",
+    )
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-c", LOGGING_WORKER.format(count=500)],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        for _ in range(2)
+    ]
+    assert [worker.wait() for worker in workers] == [0, 0]
+
+    records = 0
+    for path in tmp_path.glob("app.*.log*"):
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt") as f:
+            records += sum("Worker record" in line for line in f)
+    # Every file was rotated by the only process writing to it
+    assert records == 1000
+    assert len(list(tmp_path.glob("app.*.log.1.gz"))) == 2
+
+
+def test_queue_handler_drops_when_full():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("app.drop_test")
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        for i in range(5):
+            logger.warning("Record %d", i)
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+    assert handler.enqueued == 2
+    assert handler.dropped == 3
+    assert handler.queue.get_nowait().getMessage() == "Record 0"
+
+
+@pytest.mark.parametrize("dumps", [formatters._dumps_json, formatters._dumps_orjson])
+def test_json_formatter_includes_extras(monkeypatch, dumps):
+    if dumps is formatters._dumps_orjson and formatters.orjson is None:
+        pytest.skip("orjson is not installed")
+    monkeypatch.setattr(formatters, "dumps", dumps)
+
+    record = logging.getLogger("app.tasks_v2").makeRecord(
+        "app.tasks_v2",
+        logging.INFO,
+        __file__,
+        10,
+        "Fetching %s",
+        ("tasks",),
+        None,
+        extra={
+            "user_id": 1,
+            "filters": {"completed": True, "search": None},
+            "when": datetime(2026, 1, 2, tzinfo=timezone.utc),
+        },
+    )
+    record.created = 1767225600.25
+
+    entry = json.loads(JSONFormatter().format(record))
+    assert entry["timestamp"] == "2026-01-01T00:00:00.250000Z"
+    assert entry["message"] == "Fetching tasks"
+    assert entry["user_id"] == 1
+    assert entry["filters"] == {"completed": True, "search": None}
+    assert entry["when"].startswith("2026-01-02T00:00:00")
+    assert "args" not in entry and "msg" not in entry
+    # Extras follow the fixed fields in the order they were passed
+    assert list(entry)[-3:] == ["user_id", "filters", "when"]
+
+
+def _record(name, level, msg, **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampling_filter():
+    sampler = SamplingFilter(
+        {"app.requests": 0.0, "app.tasks_v2:Tasks fetched successfully": 0.0},
+        slow_threshold=1.0,
+    )
+
+    assert not sampler.filter(_record("app.requests", logging.INFO, "Request started"))
+    assert not sampler.filter(
+        _record("app.tasks_v2", logging.INFO, "Tasks fetched successfully")
+    )
+    assert sampler.sampled_out == 2
+
+    # Other messages, warnings, errors and slow requests always pass
+    assert sampler.filter(_record("app.tasks_v2", logging.INFO, "Fetching tasks"))
+    assert sampler.filter(_record("app.requests", logging.WARNING, "Slow"))
+    assert sampler.filter(_record("app.requests", logging.ERROR, "Failed"))
+    assert sampler.filter(
+        _record("app.requests", logging.INFO, "Request completed", response_time=2.5)
+    )
+
+
+def test_sampling_filter_keeps_request_lines_together():
+    sampler = SamplingFilter({"app.requests": 0.5})
+    for i in range(50):
+        kept = {
+            sampler.filter(
+                _record("app.requests", logging.INFO, msg, request_id=f"req_{i}")
+            )
+            for msg in ("Request started", "Request completed")
+        }
+        assert len(kept) == 1
+    assert 0 < sampler.sampled_out < 100
+
+
+def test_dedup_filter():
+    now = [0.0]
+    dedup = DedupFilter(interval=60, clock=lambda: now[0])
+
+    def warn():
+        return dedup.filter(
+            _record("app.rate_limiting", logging.WARNING, "Rate limit exceeded")
+        )
+
+    assert warn()
+    assert not any(warn() for _ in range(5))
+    assert dedup.suppressed == 5
+    assert dedup.filter(_record("app.rate_limiting", logging.INFO, "Other"))
+
+    now[0] = 61
+    record = _record("app.rate_limiting", logging.WARNING, "Rate limit exceeded")
+    assert dedup.filter(record)
+    assert record.suppressed == 5
+    assert record.getMessage() == "Rate limit exceeded (5 similar suppressed)"
+
+
+def test_dedup_filter_flushes_summaries():
+    now = [0.0]
+    dedup = DedupFilter(interval=60, clock=lambda: now[0])
+
+    for _ in range(4):
+        dedup.filter(_record("app.rate_limiting", logging.WARNING, "Burst"))
+    assert dedup.flush() == []
+
+    # The burst stopped: its count is reported once the window closes
+    now[0] = 61
+    (summary,) = dedup.flush()
+    assert summary.name == "app.rate_limiting"
+    assert summary.levelno == logging.WARNING
+    assert summary.suppressed == 3
+    assert summary.getMessage() == "Burst (3 similar suppressed)"
+    assert dedup.flush() == []
+
+    # Open windows are reported at shutdown
+    dedup.filter(_record("app.rate_limiting", logging.WARNING, "Burst"))
+    dedup.filter(_record("app.rate_limiting", logging.WARNING, "Burst"))
+    (summary,) = dedup.flush(final=True)
+    assert summary.suppressed == 1
+
+
+def test_dedup_filter_bounds_windows(monkeypatch):
+    monkeypatch.setattr(DedupFilter, "MAX_KEYS", 3)
+    now = [0.0]
+    dedup = DedupFilter(interval=60, clock=lambda: now[0])
+
+    for i in range(10):
+        now[0] = float(i)
+        dedup.filter(_record("app.slow_queries", logging.WARNING, f"Slow {i}"))
+        dedup.filter(_record("app.slow_queries", logging.WARNING, f"Slow {i}"))
+    assert len(dedup._windows) == 3
+
+    # Evicted windows still report what they suppressed
+    assert len(dedup.flush(final=True)) == 10
+
+
+@pytest.mark.asyncio
+async def test_logging_middleware_counts_queries(caplog):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+
+    @app.get("/queries")
+    async def queries():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+        return {}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        with caplog.at_level("INFO", logger="app.requests"):
+            response = await client.get("/queries")
+    await engine.dispose()
+
+    assert "db;dur=" in response.headers["Server-Timing"]
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
+    completed = [r for r in caplog.records if r.getMessage() == "Request completed"]
+    assert completed[0].db_queries == 2
+    assert completed[0].db_time >= 0
+
+
+@pytest.mark.asyncio
+async def test_query_budget():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.connect() as conn:
+        with query_budget(2) as stats:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+        assert stats.count == 2
+
+        with pytest.raises(AssertionError, match="3 queries issued, budget is 2"):
+            with query_budget(2):
+                for i in range(3):
+                    await conn.execute(text(f"SELECT {i}"))
+    await engine.dispose()
+
+
+def test_redact_parameters():
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert redact_parameters(("secret@example.com", 3, None, created)) == [
+        "<str>",
+        3,
+        None,
+        created,
+    ]
+    assert redact_parameters({"email": "a@b.c", "limit": 10}) == {
+        "email": "<str>",
+        "limit": 10,
+    }
+    assert redact_parameters([(1,), (2,)], executemany=True) == "<2 parameter sets>"
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log(caplog, monkeypatch):
+    monkeypatch.setattr(slow_query_log, "threshold", 0.000001)
+    engine = create_async_engine("sqlite+aiosqlite://")
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+
+    @app.get("/slow")
+    async def slow():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT :email"), {"email": "a@b.c"})
+        return {}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        with caplog.at_level("INFO"):
+            response = await client.get("/slow")
+    await engine.dispose()
+
+    record = next(r for r in caplog.records if r.name == "app.slow_queries")
+    assert record.getMessage() == f"Slow query {record.query_id}"
+    assert record.statement == "SELECT ?"
+    assert record.parameters == ["<str>"]
+    assert record.request_id == response.headers["X-Request-ID"]
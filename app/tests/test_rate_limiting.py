@@ -0,0 +1,177 @@
+# app/tests/test_rate_limiting.py
+import pytest
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+
+from app.utils import rate_limiting
+from app.utils.auth import create_access_token
+from app.utils.rate_limit_backends import (
+    InMemoryBackend,
+    RedisBackend,
+    SharedMemoryBackend,
+)
+from app.utils.rate_limiting import (
+    RateLimitMiddleware,
+    RouteCost,
+    get_rate_limit_key,
+    get_request_cost,
+)
+
+
+async def _exhaust(backend, key="ip:1.2.3.4", limit=3, window_seconds=60):
+    results = [await backend.is_allowed(key, limit, window_seconds) for _ in range(4)]
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert [info["remaining"] for _, info in results[:3]] == [2, 1, 0]
+    assert results[3][1]["retry_after"] > 0
+    return results
+
+
+@pytest.mark.asyncio
+async def test_memory_backend():
+    await _exhaust(InMemoryBackend())
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_idle_keys():
+    now = [1000.0]
+    backend = InMemoryBackend(max_keys=8, shards=2, clock=lambda: now[0])
+    for i in range(4):
+        await backend.is_allowed(f"ip:{i}", 10, 60)
+    assert len(backend) == 4
+
+    # Each hit holds a key for one emission interval (6s)
+    now[0] += 7
+    await backend.sweep()
+    assert len(backend) == 0
+
+    # The per-shard cap bounds memory between sweeps
+    for i in range(100):
+        assert (await backend.is_allowed(f"ip:{i}", 10, 60))[0]
+    assert len(backend) <= 8
+
+
+@pytest.mark.asyncio
+async def test_shared_memory_backend(tmp_path):
+    path = str(tmp_path / "rate_limit")
+    backend = SharedMemoryBackend(path, slots=64)
+    await _exhaust(backend)
+    assert (await backend.is_allowed("ip:5.6.7.8", 3, 60))[0]
+
+    # A second process opening the same file sees the same state
+    other = SharedMemoryBackend(path, slots=64)
+    allowed, info = await other.is_allowed("ip:1.2.3.4", 3, 60)
+    assert not allowed
+    assert info["remaining"] == 0
+
+    await backend.close()
+    await other.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_memory_backend_full_stripe(tmp_path):
+    backend = SharedMemoryBackend(str(tmp_path / "rate_limit"), slots=1)
+    for i in range(SharedMemoryBackend.STRIPE_SLOTS * 2):
+        allowed, _ = await backend.is_allowed(f"ip:{i}", 3, 60)
+        assert allowed
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_backend():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+
+    client = fakeredis.FakeAsyncRedis()
+    backend = RedisBackend("redis://unused", client=client)
+    await _exhaust(backend)
+    assert await client.pttl("ratelimit:ip:1.2.3.4") > 0
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_fails_open():
+    class BrokenScript:
+        async def __call__(self, **kwargs):
+            raise ConnectionError("down")
+
+    class BrokenClient:
+        def register_script(self, script):
+            return BrokenScript()
+
+    backend = RedisBackend("redis://unused", client=BrokenClient())
+    allowed, info = await backend.is_allowed("ip:1.2.3.4", 3, 60)
+    assert allowed
+    assert info["remaining"] == 3
+
+
+def _request(method, path, query_string=b"", headers=()):
+    return Request(
+        {
+            "type": "http",
+            "method": method,
+            "path": path,
+            "query_string": query_string,
+            "headers": list(headers),
+        }
+    )
+
+
+def test_request_cost():
+    assert get_request_cost(_request("GET", "/api/v1/tasks/1")) == 1
+    assert get_request_cost(_request("GET", "/api/v2/tasks/stats")) == 5
+    assert get_request_cost(_request("GET", "/api/v2/tasks/", b"search=x")) == 5
+    assert get_request_cost(_request("GET", "/api/v1/tasks/", b"limit=1000")) == 10
+    assert get_request_cost(_request("GET", "/api/v1/tasks/", b"limit=abc")) == 1
+    assert get_request_cost(_request("DELETE", "/api/v2/tasks/")) == 10
+    assert get_request_cost(_request("GET", "/")) == 1
+
+
+def test_rate_limit_key():
+    token = create_access_token(data={"sub": "42"})
+    request = _request(
+        "GET", "/", headers=[(b"authorization", f"Bearer {token}".encode())]
+    )
+    assert get_rate_limit_key(request) == ("user:42", True)
+
+    request = _request(
+        "GET",
+        "/",
+        headers=[(b"authorization", b"Bearer bogus"), (b"x-real-ip", b"1.2.3.4")],
+    )
+    assert get_rate_limit_key(request) == ("ip:1.2.3.4", False)
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_middleware(monkeypatch):
+    monkeypatch.setattr(rate_limiting, "rate_limiter", InMemoryBackend())
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware,
+        calls=6,
+        period=60,
+        route_costs=(RouteCost("/expensive", 5),),
+    )
+
+    @app.get("/cheap")
+    def cheap():
+        return {}
+
+    @app.get("/expensive")
+    def expensive():
+        return {}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/cheap")
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Limit"] == "6"
+        assert response.headers["X-RateLimit-Remaining"] == "5"
+
+        response = await client.get("/expensive")
+        assert response.headers["X-RateLimit-Remaining"] == "0"
+
+        response = await client.get("/expensive")
+        assert response.status_code == 429
+        assert response.json()["detail"]["message"] == "Rate limit exceeded"
+        assert int(response.headers["Retry-After"]) > 0
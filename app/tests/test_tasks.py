@@ -1,12 +1,23 @@
 # app/tests/test_tasks.py
+import csv
+import importlib.util
+import io
+import json
+import uuid
+from pathlib import Path
+
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 
 from app import models
+from app.config import settings
 from app.main import app
-from app.models import Task
+from app.models import Task, task_stats
+from app.utils import importer
 from app.utils.auth import create_access_token
+from app.utils.importer import parse_records
+from app.utils.query_stats import query_budget
 
 
 @pytest_asyncio.fixture
@@ -66,6 +77,32 @@ async def test_read_tasks_pagination(authenticated_client, db_session, test_user
     assert data["limit"] == 10
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "url, budget",
+    [
+        ("/api/v1/tasks/", 2),
+        ("/api/v2/tasks/", 2),
+        # Without a total, only the page itself is queried
+        ("/api/v1/tasks/?count=none", 1),
+        ("/api/v2/tasks/?count=none", 1),
+        ("/api/v2/tasks/stats", 1),
+    ],
+)
+async def test_task_listing_query_budget(
+    authenticated_client, db_session, test_user, url, budget
+):
+    # The number of statements must not grow with the number of tasks
+    db_session.add_all(
+        [models.Task(title=f"Task {i}", user_id=test_user.id) for i in range(20)]
+    )
+    await db_session.commit()
+
+    with query_budget(budget):
+        response = await authenticated_client.get(url)
+    assert response.status_code == 200
+
+
 @pytest.mark.asyncio
 async def test_read_task(authenticated_client, db_session, test_user):
     # Create task
@@ -89,6 +126,88 @@ async def test_read_task_not_found(authenticated_client):
     assert "Task not found" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_read_task_conditional_get(authenticated_client, db_session, test_user):
+    task = Task(title="Cached task", user_id=test_user.id)
+    db_session.add(task)
+    await db_session.commit()
+    await db_session.refresh(task)
+    url = f"/api/v1/tasks/{task.id}"
+
+    response = await authenticated_client.get(url)
+    etag = response.headers["ETag"]
+    assert not etag.startswith("W/")
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    # A match is answered from the validator query alone
+    with query_budget(1):
+        response = await authenticated_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    await authenticated_client.patch(url, json={"completed": True})
+    response = await authenticated_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+    assert response.headers["ETag"] != etag
+
+    response = await authenticated_client.get(
+        "/api/v1/tasks/99999", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/api/v1/tasks/",
+        "/api/v2/tasks/",
+        "/api/v1/tasks/?count=none",
+        "/api/v2/tasks/?count=none",
+    ],
+)
+async def test_task_listing_conditional_get(
+    authenticated_client, db_session, test_user, url
+):
+    task = Task(title="Listed task", user_id=test_user.id)
+    db_session.add(task)
+    await db_session.commit()
+    await db_session.refresh(task)
+
+    response = await authenticated_client.get(url)
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    with query_budget(1):
+        response = await authenticated_client.get(
+            url, headers={"If-None-Match": f'"other", {etag}'}
+        )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    # Other parameters describe another page
+    response = await authenticated_client.get(
+        url, params={"limit": 1}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+    # Creates, updates and deletes all change the validator
+    etags = {etag}
+    for method, path, body in [
+        ("POST", "/api/v1/tasks/", {"title": "New task"}),
+        ("PATCH", f"/api/v1/tasks/{task.id}", {"title": "Renamed"}),
+        ("DELETE", f"/api/v1/tasks/{task.id}", None),
+    ]:
+        await authenticated_client.request(method, path, json=body)
+        response = await authenticated_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        etags.add(etag)
+    assert len(etags) == 4
+
+
 @pytest.mark.asyncio
 async def test_update_task(authenticated_client, db_session, test_user):
     # Create task
@@ -157,3 +276,434 @@ async def test_read_tasks_unauthenticated(client):
     response = await client.get("/api/v1/tasks/")
     assert response.status_code == 401
     assert "detail" in response.json()
+
+
+@pytest.mark.asyncio
+async def test_read_tasks_cursor_pagination(
+    authenticated_client, db_session, test_user
+):
+    for i in range(5):
+        db_session.add(models.Task(title=f"Task {i}", user_id=test_user.id))
+    await db_session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await authenticated_client.get("/api/v2/tasks/", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(task["id"] for task in data["tasks"])
+        cursor = data["next_cursor"]
+        assert data["has_more"] is (cursor is not None)
+        if not cursor:
+            break
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+@pytest.mark.asyncio
+async def test_read_tasks_invalid_cursor(authenticated_client):
+    response = await authenticated_client.get("/api/v1/tasks/?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", ["exact", "window", "estimate"])
+async def test_read_tasks_count_modes(
+    authenticated_client, db_session, test_user, count
+):
+    for i in range(3):
+        db_session.add(models.Task(title=f"Task {i}", user_id=test_user.id))
+    await db_session.commit()
+
+    response = await authenticated_client.get(
+        "/api/v2/tasks/", params={"limit": 2, "count": count}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    if count == "estimate":
+        # Planner estimates are approximate (exact on SQLite)
+        assert isinstance(data["total"], int)
+    else:
+        assert data["total"] == 3
+    assert len(data["tasks"]) == 2
+    assert data["has_more"] is True
+
+
+@pytest.mark.asyncio
+async def test_read_tasks_without_count(authenticated_client, db_session, test_user):
+    for i in range(3):
+        db_session.add(models.Task(title=f"Task {i}", user_id=test_user.id))
+    await db_session.commit()
+
+    response = await authenticated_client.get(
+        "/api/v2/tasks/", params={"limit": 3, "count": "none"}
+    )
+    data = response.json()
+    assert data["total"] is None
+    assert len(data["tasks"]) == 3
+    assert data["has_more"] is False
+
+
+@pytest.mark.asyncio
+async def test_task_stats_follow_writes(authenticated_client, db_session, test_user):
+    for i in range(3):
+        response = await authenticated_client.post(
+            "/api/v1/tasks/", json={"title": f"Task {i}"}
+        )
+        assert response.status_code == 200
+    task_id = response.json()["id"]
+
+    # Tasks written outside the API are counted as well
+    db_session.add(models.Task(title="Direct", completed=True, user_id=test_user.id))
+    await db_session.commit()
+
+    await authenticated_client.put(
+        f"/api/v1/tasks/{task_id}", json={"title": "Done", "completed": True}
+    )
+    response = await authenticated_client.get("/api/v2/tasks/stats")
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["total_tasks"] == 4
+    assert stats["completed_tasks"] == 2
+    assert stats["pending_tasks"] == 2
+    assert stats["tasks_this_week"] == 4
+
+    await authenticated_client.delete(f"/api/v1/tasks/{task_id}")
+    stats = (await authenticated_client.get("/api/v2/tasks/stats")).json()
+    assert stats["total_tasks"] == 3
+    assert stats["completed_tasks"] == 1
+    assert stats["tasks_this_week"] == 3
+
+
+def test_task_stats_ddl_in_sync():
+    # The migration keeps its own copy of the trigger DDL; create_all must
+    # build the same triggers as a migrated database
+    path = next(Path(__file__).parents[2].glob("alembic/versions/97b409b86c26_*.py"))
+    spec = importlib.util.spec_from_file_location("task_stats_migration", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    def normalize(ddl):
+        return {
+            dialect: [" ".join(statement.split()) for statement in statements]
+            for dialect, statements in ddl.items()
+        }
+
+    assert normalize(migration.TASK_STATS_DDL) == normalize(task_stats.TASK_STATS_DDL)
+    assert normalize(migration.TASK_STATS_DROP_DDL) == normalize(
+        task_stats.TASK_STATS_DROP_DDL
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_tasks(authenticated_client, db_session, test_user):
+    db_session.add_all(
+        [
+            models.Task(title="Buy groceries", user_id=test_user.id),
+            models.Task(
+                title="Weekend",
+                description="groceries and laundry",
+                user_id=test_user.id,
+            ),
+            models.Task(title="Write report", user_id=test_user.id),
+        ]
+    )
+    await db_session.commit()
+
+    response = await authenticated_client.get(
+        "/api/v2/tasks/", params={"search": "groceries", "sort": "relevance"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    # Title matches rank above description matches
+    assert [task["title"] for task in data["tasks"]] == ["Buy groceries", "Weekend"]
+
+    # Edits are reflected in the index
+    task_id = data["tasks"][1]["id"]
+    await authenticated_client.put(
+        f"/api/v1/tasks/{task_id}", json={"title": "Weekend", "description": "laundry"}
+    )
+    response = await authenticated_client.get(
+        "/api/v2/tasks/", params={"search": "groceries"}
+    )
+    assert response.json()["total"] == 1
+
+    # Query syntax in user input is treated as plain text
+    response = await authenticated_client.get(
+        "/api/v2/tasks/", params={"search": 'report"*'}
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_tasks(authenticated_client, test_user):
+    items = [{"title": f"Bulk {i}", "completed": i % 2 == 0} for i in range(5)]
+    response = await authenticated_client.post(
+        "/api/v2/tasks/bulk", json={"items": items}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["errors"] == []
+    assert [task["title"] for task in data["created"]] == [
+        f"Bulk {i}" for i in range(5)
+    ]
+    assert all(task["user_id"] == test_user.id for task in data["created"])
+
+    stats = (await authenticated_client.get("/api/v2/tasks/stats")).json()
+    assert stats["total_tasks"] == 5
+    assert stats["completed_tasks"] == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_tasks_validation(authenticated_client):
+    items = [{"title": "Valid"}, {"description": "missing title"}]
+
+    # All-or-nothing rejects the whole batch
+    response = await authenticated_client.post(
+        "/api/v2/tasks/bulk", json={"items": items}
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"]["errors"][0]["index"] == 1
+
+    # Partial mode creates the valid items and reports the rest
+    response = await authenticated_client.post(
+        "/api/v2/tasks/bulk", json={"items": items, "all_or_nothing": False}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [task["title"] for task in data["created"]] == ["Valid"]
+    assert data["errors"][0]["index"] == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_rejects_long_titles(authenticated_client):
+    # The column is String(100): too long a title must be reported for its
+    # item, not fail the whole INSERT
+    items = [{"title": "Short"}, {"title": "x" * 101}]
+
+    response = await authenticated_client.post(
+        "/api/v2/tasks/bulk", json={"items": items, "all_or_nothing": False}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [task["title"] for task in data["created"]] == ["Short"]
+    assert data["errors"][0]["index"] == 1
+    assert data["errors"][0]["errors"][0]["type"] == "string_too_long"
+
+    response = await authenticated_client.post(
+        "/api/v1/tasks/", json={"title": "x" * 101}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_patch_task(authenticated_client, db_session, test_user):
+    task = Task(title="Keep title", description="Old", user_id=test_user.id)
+    db_session.add(task)
+    await db_session.commit()
+    await db_session.refresh(task)
+
+    response = await authenticated_client.patch(
+        f"/api/v1/tasks/{task.id}", json={"completed": True}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["title"] == "Keep title"
+    assert data["description"] == "Old"
+    assert data["completed"] is True
+
+    response = await authenticated_client.patch(
+        f"/api/v1/tasks/{task.id}", json={"title": None}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_write_other_users_task_forbidden(authenticated_client, db_session):
+    other = models.User(email=f"other_{uuid.uuid4()}@example.com")
+    db_session.add(other)
+    await db_session.commit()
+    task = Task(title="Not yours", user_id=other.id)
+    db_session.add(task)
+    await db_session.commit()
+
+    response = await authenticated_client.patch(
+        f"/api/v1/tasks/{task.id}", json={"title": "Mine now"}
+    )
+    assert response.status_code == 403
+    response = await authenticated_client.delete(f"/api/v1/tasks/{task.id}")
+    assert response.status_code == 403
+
+    await db_session.delete(other)
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_and_delete_by_filter(
+    authenticated_client, db_session, test_user
+):
+    db_session.add_all(
+        [
+            Task(title=f"Filtered {i}", completed=i % 2 == 0, user_id=test_user.id)
+            for i in range(4)
+        ]
+    )
+    await db_session.commit()
+
+    response = await authenticated_client.patch(
+        "/api/v2/tasks/?completed=false&dry_run=true", json={"completed": True}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"affected": 2, "dry_run": True}
+
+    response = await authenticated_client.patch(
+        "/api/v2/tasks/?completed=false", json={"completed": True}
+    )
+    assert response.json() == {"affected": 2, "dry_run": False}
+
+    response = await authenticated_client.get("/api/v2/tasks/?completed=false")
+    assert response.json()["total"] == 0
+
+    response = await authenticated_client.delete("/api/v2/tasks/?completed=true")
+    assert response.json() == {"affected": 4, "dry_run": False}
+
+    response = await authenticated_client.get("/api/v2/tasks/")
+    assert response.json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_write_by_filter_cap(
+    authenticated_client, db_session, test_user, monkeypatch
+):
+    monkeypatch.setattr(settings, "bulk_max_affected", 2)
+    db_session.add_all(
+        [Task(title=f"Capped {i}", user_id=test_user.id) for i in range(3)]
+    )
+    await db_session.commit()
+
+    response = await authenticated_client.delete("/api/v2/tasks/")
+    assert response.status_code == 409
+
+    response = await authenticated_client.get("/api/v2/tasks/")
+    assert response.json()["total"] == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+async def test_export_tasks(
+    authenticated_client, db_session, test_user, monkeypatch, export_format
+):
+    monkeypatch.setattr(settings, "export_chunk_size", 2)
+    db_session.add_all(
+        [
+            Task(
+                title=f"Export {i}",
+                description="line one\nline two, \"quoted\"",
+                completed=i == 0,
+                user_id=test_user.id,
+            )
+            for i in range(5)
+        ]
+    )
+    await db_session.commit()
+
+    response = await authenticated_client.get(
+        f"/api/v2/tasks/export?format={export_format}&completed=false"
+    )
+    assert response.status_code == 200
+
+    if export_format == "ndjson":
+        rows = [json.loads(line) for line in response.text.splitlines()]
+    else:
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 4
+    assert {row["title"] for row in rows} == {f"Export {i}" for i in range(1, 5)}
+    assert rows[0]["description"] == "line one\nline two, \"quoted\""
+
+
+@pytest.mark.asyncio
+async def test_import_tasks_ndjson(authenticated_client, test_user, monkeypatch):
+    monkeypatch.setattr(settings, "import_batch_size", 2)
+    body = "\n".join(
+        [
+            json.dumps({"title": "Imported 1", "completed": True}),
+            json.dumps({"title": "Imported 2", "description": "d"}),
+            "not json",
+            json.dumps({"description": "no title"}),
+            "",
+            json.dumps({"title": "Imported 3"}),
+        ]
+    )
+
+    response = await authenticated_client.post(
+        "/api/v2/tasks/import?format=ndjson", content=body.encode()
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 3
+    assert data["rejected"] == 2
+    assert [error["index"] for error in data["errors"]] == [2, 3]
+
+    response = await authenticated_client.get("/api/v2/tasks/?search=imported")
+    assert response.json()["total"] == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("import_format", ["ndjson", "csv"])
+async def test_import_rejects_overlong_lines(monkeypatch, import_format):
+    monkeypatch.setattr(importer, "MAX_RECORD_CHARS", 100)
+    received = []
+
+    async def chunks():
+        yield b"title\n" if import_format == "csv" else b""
+        # Far more than MAX_RECORD_CHARS before the first newline
+        for _ in range(1000):
+            received.append(len(received))
+            yield b"x" * 50
+        yield b'x\n{"title": "After"}\n' if import_format == "ndjson" else b"x\nAfter\n"
+
+    records = []
+    async for record in parse_records(chunks(), import_format):
+        records.append((len(received), record))
+
+    # Rejected once the limit is passed, not after the line is buffered
+    (chunks_read, error), *rest = records
+    assert error[0]["type"] == "record_too_long"
+    assert chunks_read == 3
+    assert [record for _, record in rest] == [{"title": "After"}]
+
+
+@pytest.mark.asyncio
+async def test_import_tasks_csv(authenticated_client, test_user):
+    body = (
+        'title,description,completed\n'
+        'Plain,,false\n'
+        '"Multi","line one\nline two, ""quoted""",true\n'
+        'Too,many,columns,here\n'
+    )
+
+    async def chunks():
+        # Split records across chunk boundaries
+        for start in range(0, len(body), 7):
+            yield body[start : start + 7].encode()
+
+    response = await authenticated_client.post(
+        "/api/v2/tasks/import?format=csv", content=chunks()
+    )
+    data = response.json()
+    assert data["imported"] == 2
+    assert data["rejected"] == 1
+
+    response = await authenticated_client.get("/api/v2/tasks/export?format=ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    by_title = {row["title"]: row for row in rows}
+    assert by_title["Plain"]["description"] is None
+    assert by_title["Multi"]["description"] == 'line one\nline two, "quoted"'
+    assert by_title["Multi"]["completed"] is True
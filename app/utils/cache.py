@@ -0,0 +1,88 @@
+"""
+In-process cache shared by the token and user profile caches.
+
+Each worker process has its own copy, so entries must either stay valid
+until they expire or be acceptable to serve for their remaining lifetime.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from app.utils.metrics import CACHE_LOOKUPS
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class ExpiringLRUCache(Generic[K, V]):
+    """
+    Bounded LRU whose entries each expire at their own time.
+
+    Expired entries are dropped when looked up; once max_size is reached,
+    the least recently used entry makes room. A max_size of 0 disables the
+    cache. Lookups are counted per cache name in cache_lookups_total.
+    """
+
+    def __init__(
+        self, name: str, max_size: int, clock: Callable[[], float] = time.time
+    ):
+        self.name = name
+        self.max_size = max_size
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        # key -> (expires at, value)
+        self._entries: OrderedDict[K, Tuple[float, V]] = OrderedDict()
+        # Reentrant so subclasses can hold it around the methods below
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+        if self.max_size <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                result = "hit"
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                    entry = None
+                self.misses += 1
+                result = "miss"
+        CACHE_LOOKUPS.labels(self.name, result).inc()
+        return entry[1] if entry is not None else None
+
+    def put(self, key: K, value: V, expires_at: float = float("inf")) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of size and hit rate"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+        }
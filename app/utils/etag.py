@@ -0,0 +1,129 @@
+"""
+ETags and conditional GET for task reads.
+
+A single task gets a strong ETag from its id and updated_at. Listings get
+a weak ETag that also covers the request's parameters. With count=exact it
+comes from the number of matching tasks and their latest updated_at: any
+create, update or delete in the filtered set changes one of the two, and
+the aggregate query doubles as the COUNT, so a match skips fetching and
+serializing the page. The other count modes exist to avoid full-set
+queries, so their ETag is derived from the fetched page instead and a
+match only saves serializing and sending it.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple, Union
+
+from fastapi import Response
+from sqlalchemy import ColumnElement, and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.utils.pagination import CountMode, fetch_task_page
+
+# Clients must revalidate, and shared caches must not store per-user data
+CACHE_CONTROL = "private, no-cache"
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+
+def task_etag(task_id: int, updated_at: datetime) -> str:
+    """Strong ETag of one task"""
+    return f'"{_digest(task_id, updated_at.isoformat())}"'
+
+
+async def listing_validator(
+    db: AsyncSession, conditions: Sequence[ColumnElement[bool]]
+) -> Tuple[int, Optional[datetime]]:
+    """Number of matching tasks and their latest updated_at, in one query"""
+    result = await db.execute(
+        select(func.count(models.Task.id), func.max(models.Task.updated_at)).where(
+            and_(*conditions)
+        )
+    )
+    total, last_updated = result.one()
+    return total, last_updated
+
+
+def listing_etag(
+    total: int, last_updated: Optional[datetime], params: Mapping[str, Any]
+) -> str:
+    """Weak ETag of a listing page, from listing_validator and the parameters"""
+    return 'W/"{}"'.format(
+        _digest(
+            total,
+            last_updated.isoformat() if last_updated else None,
+            sorted(params.items()),
+        )
+    )
+
+
+def page_etag(page: Dict[str, Any], params: Mapping[str, Any]) -> str:
+    """Weak ETag of a fetched listing page, from its tasks and totals"""
+    return 'W/"{}"'.format(
+        _digest(
+            [(task.id, task.updated_at.isoformat()) for task in page["tasks"]],
+            page["total"],
+            page["has_more"],
+            sorted(params.items()),
+        )
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """304 response for a matching conditional GET"""
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+async def fetch_conditional_task_page(
+    db: AsyncSession,
+    response: Response,
+    if_none_match: Optional[str],
+    conditions: Sequence[ColumnElement[bool]],
+    params: Mapping[str, Any],
+    count: CountMode = "exact",
+    **page_options: Any,
+) -> Union[Response, Dict[str, Any]]:
+    """
+    fetch_task_page with a weak ETag set on response, or a 304 response
+    when if_none_match matches it. params must identify the page requested.
+    """
+    if count == "exact":
+        total, last_updated = await listing_validator(db, conditions)
+        etag = listing_etag(total, last_updated, params)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        page = await fetch_task_page(
+            db, conditions, count=count, exact_total=total, **page_options
+        )
+    else:
+        page = await fetch_task_page(db, conditions, count=count, **page_options)
+        etag = page_etag(page, params)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    set_etag(response, etag)
+    return page
@@ -0,0 +1,84 @@
+"""
+Streaming export of tasks as NDJSON or CSV.
+
+Rows are read through a server-side cursor and serialized one chunk at a time,
+so memory use does not depend on how many tasks are exported.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Literal, Sequence
+
+from sqlalchemy import ColumnElement, Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.utils.pagination import TASK_ORDER
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_MEDIA_TYPES: Dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Columns are selected directly so no ORM objects are built per row
+EXPORT_COLUMNS = (
+    models.Task.id,
+    models.Task.title,
+    models.Task.description,
+    models.Task.completed,
+    models.Task.created_at,
+    models.Task.updated_at,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+
+def _json_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _ndjson_chunk(rows: Sequence[Row[Any]]) -> str:
+    return "".join(
+        json.dumps(
+            {field: _json_value(value) for field, value in zip(EXPORT_FIELDS, row)},
+            ensure_ascii=False,
+        )
+        + "\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(rows: Sequence[Sequence[Any]]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [_json_value(value) if value is not None else "" for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+async def stream_tasks(
+    db: AsyncSession,
+    conditions: Sequence[ColumnElement[bool]],
+    export_format: ExportFormat,
+    chunk_size: int,
+) -> AsyncIterator[str]:
+    """Yield the matching tasks serialized in chunks of chunk_size rows"""
+    if export_format == "csv":
+        serialize = _csv_chunk
+        yield _csv_chunk([EXPORT_FIELDS])
+    else:
+        serialize = _ndjson_chunk
+
+    result = await db.stream(
+        select(*EXPORT_COLUMNS)
+        .where(*conditions)
+        .order_by(*TASK_ORDER)
+        .execution_options(yield_per=chunk_size)
+    )
+    async for rows in result.partitions():
+        yield serialize(rows)
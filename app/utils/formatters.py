@@ -0,0 +1,88 @@
+"""
+Log formatters
+"""
+
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Attributes every LogRecord has, plus those added by formatters and the
+# queue handler. Anything else on a record was passed through `extra`.
+RESERVED_ATTRS = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None))
+) | {"message", "asctime", "taskName"}
+
+
+def _default(value: Any) -> Any:
+    isoformat = getattr(value, "isoformat", None)
+    return isoformat() if isoformat else str(value)
+
+
+def _dumps_json(log_entry: Dict[str, Any]) -> str:
+    return json.dumps(log_entry, ensure_ascii=False, default=_default)
+
+
+def _dumps_orjson(log_entry: Dict[str, Any]) -> str:
+    try:
+        return orjson.dumps(
+            log_entry, default=_default, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+    except TypeError:
+        # e.g. integers beyond 64 bits, which only the json module handles
+        return _dumps_json(log_entry)
+
+
+dumps: Callable[[Dict[str, Any]], str] = _dumps_orjson if orjson else _dumps_json
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    JSON formatter for structured logging.
+
+    Every `extra` field is included. The timestamp comes from record.created,
+    with the seconds part cached since consecutive records share it.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._second: Tuple[int, str] = (-1, "")
+
+    def format_timestamp(self, created: float) -> str:
+        second = int(created)
+        cached_second, prefix = self._second
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}Z"
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_entry = {
+            "timestamp": self.format_timestamp(record.created),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+        }
+
+        # Add exception info if present
+        if record.exc_info:
+            log_entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_entry["exception"] = record.exc_text
+        if record.stack_info:
+            log_entry["stack"] = record.stack_info
+
+        # Add extra fields, in the order they were passed
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS:
+                log_entry[key] = value
+
+        return dumps(log_entry)
@@ -0,0 +1,170 @@
+"""
+Password hashing service backed by a bounded executor pool.
+
+bcrypt is deliberately slow (~200ms per call), so hashing and verification are
+offloaded to a dedicated thread or process pool instead of running on the event
+loop. The number of in-flight jobs is capped; once the pool and its queue are
+full, new requests fail fast with a 503 instead of piling up.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.utils.auth import hash_password, verify_password
+from app.utils.logging import get_logger
+from app.utils.metrics import (
+    PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_IN_FLIGHT,
+    PASSWORD_HASH_QUEUE_DEPTH,
+    PASSWORD_HASH_REJECTED,
+)
+
+logger = get_logger("hashing")
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing/verification on a bounded executor pool"""
+
+    def __init__(
+        self,
+        executor_type: str = "thread",
+        max_workers: int = 4,
+        queue_size: int = 64,
+    ):
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor: {executor_type}")
+
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self._executor: Optional[Executor] = None
+
+        # Metrics; in_flight counts jobs submitted and not yet finished, and
+        # completed the results handed back to a caller
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of jobs running or waiting at any time"""
+        return self.max_workers + self.queue_size
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a free worker"""
+        return max(0, self.in_flight - self.max_workers)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        # Reject before queueing so a login storm cannot exhaust memory
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            PASSWORD_HASH_REJECTED.inc()
+            logger.warning(
+                "Password hashing pool saturated",
+                extra={"in_flight": self.in_flight, "capacity": self.capacity},
+            )
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        with self._lock:
+            self.in_flight += 1
+            self._update_gauges()
+        start_time = time.perf_counter()
+        try:
+            job = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        # The slot is held until the job itself ends: a cancelled caller
+        # stops waiting, but a running bcrypt call carries on in the pool
+        job.add_done_callback(self._release)
+        result = await asyncio.wrap_future(job)
+
+        latency = time.perf_counter() - start_time
+        self.completed += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        PASSWORD_HASH_DURATION.observe(latency)
+        return result
+
+    def _release(self, job: Optional[Future]) -> None:
+        # Runs in the worker thread, or on the event loop if the job was
+        # cancelled before it started
+        with self._lock:
+            self.in_flight -= 1
+            self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        PASSWORD_HASH_IN_FLIGHT.set(self.in_flight)
+        PASSWORD_HASH_QUEUE_DEPTH.set(self.queue_depth)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password without blocking the event loop"""
+        result: str = await self._run(hash_password, password)
+        return result
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password without blocking the event loop"""
+        if not plain_password or not hashed_password:
+            return False
+        result: bool = await self._run(verify_password, plain_password, hashed_password)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth and latency metrics"""
+        return {
+            "executor": self.executor_type,
+            "workers": self.max_workers,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_latency_ms": round(
+                (self.total_latency / self.completed * 1000) if self.completed else 0,
+                2,
+            ),
+            "max_latency_ms": round(self.max_latency * 1000, 2),
+        }
+
+    def shutdown(self) -> None:
+        """Stop the executor pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher(
+    executor_type=settings.password_hash_executor,
+    max_workers=settings.password_hash_workers,
+    queue_size=settings.password_hash_queue_size,
+)
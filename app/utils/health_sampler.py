@@ -0,0 +1,151 @@
+"""
+Background sampler for health and system metrics.
+
+Probes run on an interval from the application lifespan, concurrently and
+each with a timeout, so health endpoints only read the latest snapshot and
+never block the event loop.
+"""
+
+import asyncio
+import contextlib
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import psutil
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine
+from app.utils.logging import get_log_stats, get_logger
+from app.utils.metrics import (
+    LOG_QUEUE_DEPTH,
+    SYSTEM_CPU_PERCENT,
+    SYSTEM_DISK_PERCENT,
+    SYSTEM_MEMORY_PERCENT,
+)
+
+logger = get_logger("health")
+
+
+def _system_metrics() -> Dict[str, Any]:
+    # interval=None compares against the previous call instead of sleeping
+    cpu_percent = psutil.cpu_percent(interval=None)
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
+
+    check: Dict[str, Any] = {
+        "status": "healthy",
+        "metrics": {
+            "cpu_percent": cpu_percent,
+            "memory_percent": memory.percent,
+            "memory_available_gb": round(memory.available / (1024**3), 2),
+            "disk_percent": disk.percent,
+            "disk_free_gb": round(disk.free / (1024**3), 2),
+        },
+    }
+
+    # Alert if resources are high
+    if cpu_percent > 80 or memory.percent > 80 or disk.percent > 90:
+        check["status"] = "warning"
+        check["message"] = "High resource usage detected"
+    return check
+
+
+async def check_system() -> Dict[str, Any]:
+    return await asyncio.to_thread(_system_metrics)
+
+
+async def check_database() -> Dict[str, Any]:
+    start_time = time.perf_counter()
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return {
+        "status": "healthy",
+        "message": "Database connection successful",
+        "latency_ms": round((time.perf_counter() - start_time) * 1000, 2),
+    }
+
+
+def update_metrics(snapshot: Dict[str, Any]) -> None:
+    """Copy sampled values to the gauges, from every worker on each sample"""
+    system = snapshot["checks"].get("system", {}).get("metrics")
+    if system:
+        SYSTEM_CPU_PERCENT.set(system["cpu_percent"])
+        SYSTEM_MEMORY_PERCENT.set(system["memory_percent"])
+        SYSTEM_DISK_PERCENT.set(system["disk_percent"])
+    LOG_QUEUE_DEPTH.set(get_log_stats()["queued"])
+
+
+class HealthSampler:
+    """Runs health checks periodically and keeps the latest results"""
+
+    def __init__(
+        self,
+        checks: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]],
+        interval: float,
+        timeout: float,
+        on_sample: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.checks = checks
+        self.interval = interval
+        self.timeout = timeout
+        self.on_sample = on_sample
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run_check(
+        self, name: str, check: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        try:
+            return await asyncio.wait_for(check(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            message = f"Check timed out after {self.timeout}s"
+        except Exception as e:
+            message = f"Check failed: {str(e)}"
+        logger.error("Health check failed", extra={"check": name, "error": message})
+        return {"status": "unhealthy", "message": message}
+
+    async def sample(self) -> Dict[str, Any]:
+        """Run every check concurrently and store the results"""
+        results = await asyncio.gather(
+            *(self._run_check(name, check) for name, check in self.checks.items())
+        )
+        self.snapshot = {
+            "sampled_at": datetime.now(timezone.utc),
+            "checks": dict(zip(self.checks, results)),
+        }
+        if self.on_sample is not None:
+            self.on_sample(self.snapshot)
+        return self.snapshot
+
+    async def latest(self) -> Dict[str, Any]:
+        """Latest snapshot, sampled now if the background task has not run yet"""
+        return self.snapshot or await self.sample()
+
+    async def _sample_forever(self) -> None:
+        while True:
+            await self.sample()
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        if self._task is None:
+            # Prime cpu_percent, whose first call has nothing to compare to
+            await check_system()
+            self._task = asyncio.create_task(self._sample_forever())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+# Global sampler instance
+health_sampler = HealthSampler(
+    {"database": check_database, "system": check_system},
+    interval=settings.health_check_interval,
+    timeout=settings.health_check_timeout,
+    on_sample=update_metrics,
+)
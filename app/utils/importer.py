@@ -0,0 +1,240 @@
+"""
+Streaming import of tasks from NDJSON or CSV.
+
+The input is consumed as a stream of byte chunks and parsed record by record.
+Valid rows are written in batches, with COPY on PostgreSQL (asyncpg) and an
+executemany INSERT elsewhere, so memory use is bounded by the batch size.
+"""
+
+import codecs
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.schemas.task import BulkItemError, TaskCreate
+
+ImportFormat = Literal["ndjson", "csv"]
+
+# Column order of the records handed to COPY
+IMPORT_COLUMNS = (
+    "title",
+    "description",
+    "completed",
+    "user_id",
+    "created_at",
+    "updated_at",
+)
+
+# A line or record that grows past this many characters (e.g. an upload
+# without newlines, or a CSV quote that is never closed) is rejected instead
+# of buffering the rest of the input
+MAX_RECORD_CHARS = 1024 * 1024
+
+# A parsed record, or the errors that made it unreadable
+ParsedRecord = Union[Dict[str, Any], List[Dict[str, Any]]]
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    rejected: int = 0
+    errors: List[BulkItemError] = field(default_factory=list)
+
+
+def _record_error(error_type: str, msg: str) -> List[Dict[str, Any]]:
+    return [{"type": error_type, "loc": [], "msg": msg, "input": None}]
+
+
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[Optional[str]]:
+    """
+    Decode byte chunks into lines, keeping the line endings.
+
+    A line longer than MAX_RECORD_CHARS is yielded as None once, and the rest
+    of it is skipped up to the next newline rather than buffered.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    # Pieces of the current line, joined once its newline arrives
+    pieces: List[str] = []
+    size = 0
+    skipping = False
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        start = 0
+        while start < len(text):
+            end = text.find("\n", start) + 1 or len(text)
+            if not skipping:
+                size += end - start
+                if size > MAX_RECORD_CHARS:
+                    pieces, skipping = [], True
+                    yield None
+                else:
+                    pieces.append(text[start:end])
+            if text[end - 1] == "\n":
+                if not skipping:
+                    yield "".join(pieces)
+                pieces, size, skipping = [], 0, False
+            start = end
+    if not skipping:
+        pieces.append(decoder.decode(b"", final=True))
+        line = "".join(pieces)
+        if line:
+            yield line if len(line) <= MAX_RECORD_CHARS else None
+
+
+async def _ndjson_records(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[ParsedRecord]:
+    async for line in _lines(chunks):
+        if line is None:
+            yield _record_error("record_too_long", "Record is too long")
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield _record_error("json_invalid", f"Invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield _record_error("dict_type", "Expected a JSON object")
+            continue
+        yield record
+
+
+async def _csv_records(chunks: AsyncIterable[bytes]) -> AsyncIterator[ParsedRecord]:
+    header: Optional[List[str]] = None
+    pending = ""
+    quotes = 0
+    async for line in _lines(chunks):
+        if line is None:
+            yield _record_error("record_too_long", "Record is too long")
+            pending, quotes = "", 0
+            continue
+        pending += line
+        quotes += line.count('"')
+        if quotes % 2:
+            # Inside a quoted field that spans lines
+            if len(pending) > MAX_RECORD_CHARS:
+                yield _record_error("record_too_long", "Record is too long")
+                pending, quotes = "", 0
+            continue
+
+        record, pending, quotes = pending, "", 0
+        if not record.strip():
+            continue
+        values = next(csv.reader(io.StringIO(record)))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield _record_error(
+                "csv_columns",
+                f"Expected {len(header)} columns, got {len(values)}",
+            )
+            continue
+        # Empty cells are treated as missing so field defaults apply
+        yield {name: value for name, value in zip(header, values) if value != ""}
+
+    if pending.strip():
+        yield _record_error("csv_unterminated", "Unterminated quoted field")
+
+
+def parse_records(
+    chunks: AsyncIterable[bytes], import_format: ImportFormat
+) -> AsyncIterator[ParsedRecord]:
+    """Parse a byte stream into task records"""
+    if import_format == "csv":
+        return _csv_records(chunks)
+    return _ndjson_records(chunks)
+
+
+def _validate(record: Dict[str, Any]) -> Union[TaskCreate, List[Dict[str, Any]]]:
+    try:
+        return TaskCreate.model_validate(record)
+    except ValidationError as e:
+        return e.errors(include_url=False, include_context=False)
+
+
+async def _enumerate(
+    records: AsyncIterator[ParsedRecord],
+) -> AsyncIterator[Tuple[int, ParsedRecord]]:
+    index = 0
+    async for record in records:
+        yield index, record
+        index += 1
+
+
+async def _write_batch(db: AsyncSession, rows: List[Tuple[Any, ...]]) -> None:
+    if db.get_bind().dialect.driver == "asyncpg":
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            models.Task.__tablename__, records=rows, columns=IMPORT_COLUMNS
+        )
+    else:
+        await db.execute(
+            insert(models.Task), [dict(zip(IMPORT_COLUMNS, row)) for row in rows]
+        )
+    await db.commit()
+
+
+async def import_tasks(
+    db: AsyncSession,
+    chunks: AsyncIterable[bytes],
+    import_format: ImportFormat,
+    user_id: int,
+    batch_size: int,
+    max_errors: int,
+    on_progress: Optional[Callable[[ImportResult], None]] = None,
+) -> ImportResult:
+    """
+    Import tasks for a user from a stream of NDJSON or CSV bytes.
+
+    Every batch is committed on its own, so rows imported before a failure are
+    kept. Only the first max_errors rejects are reported in detail.
+    """
+    result = ImportResult()
+    batch: List[Tuple[Any, ...]] = []
+
+    async def flush() -> None:
+        await _write_batch(db, batch)
+        result.imported += len(batch)
+        batch.clear()
+        if on_progress:
+            on_progress(result)
+
+    async for index, record in _enumerate(parse_records(chunks, import_format)):
+        task = _validate(record) if isinstance(record, dict) else record
+        if isinstance(task, list):
+            result.rejected += 1
+            if len(result.errors) < max_errors:
+                result.errors.append(BulkItemError(index=index, errors=task))
+            continue
+
+        now = datetime.now(UTC)
+        batch.append((task.title, task.description, task.completed, user_id, now, now))
+        if len(batch) >= batch_size:
+            await flush()
+
+    if batch:
+        await flush()
+    return result
@@ -0,0 +1,173 @@
+"""
+Logging filters that cut log volume: sampling and duplicate suppression
+"""
+
+import logging
+import random
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.utils.metrics import LOG_RECORDS_SAMPLED_OUT, LOG_RECORDS_SUPPRESSED
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of INFO and DEBUG records.
+
+    Rates are keyed by logger name, which also covers child loggers, or by
+    "logger:message template" for a single message. Warnings, errors and
+    records with a response_time at or above slow_threshold always pass.
+    Records carrying a request_id are sampled by that id, so the lines of one
+    request are kept or dropped together.
+    """
+
+    CACHE_SIZE = 10000
+
+    def __init__(
+        self,
+        rates: Dict[str, float],
+        slow_threshold: Optional[float] = None,
+        random_fn: Callable[[], float] = random.random,
+    ):
+        super().__init__()
+        self.rates = rates
+        self.slow_threshold = slow_threshold
+        self.random_fn = random_fn
+        self.sampled_out = 0
+        self._cache: Dict[Tuple[str, str], float] = {}
+
+    def rate_for(self, name: str, msg: str) -> float:
+        key = (name, msg)
+        rate = self._cache.get(key)
+        if rate is None:
+            rate = self.rates.get(f"{name}:{msg}")
+            logger_name = name
+            while rate is None and logger_name:
+                rate = self.rates.get(logger_name)
+                logger_name = logger_name.rpartition(".")[0]
+            rate = 1.0 if rate is None else rate
+            if len(self._cache) >= self.CACHE_SIZE:
+                # Messages built with f-strings would grow the cache forever
+                self._cache.clear()
+            self._cache[key] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.rates or record.levelno >= logging.WARNING:
+            return True
+
+        rate = self.rate_for(record.name, str(record.msg))
+        if rate >= 1:
+            return True
+
+        response_time = getattr(record, "response_time", None)
+        if (
+            self.slow_threshold is not None
+            and response_time is not None
+            and response_time >= self.slow_threshold
+        ):
+            return True
+
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            sample = zlib.crc32(str(request_id).encode()) / 0xFFFFFFFF
+        else:
+            sample = self.random_fn()
+        if sample < rate:
+            return True
+
+        self.sampled_out += 1
+        LOG_RECORDS_SAMPLED_OUT.inc()
+        return False
+
+
+class DedupFilter(logging.Filter):
+    """
+    Collapse repeated identical warnings.
+
+    The first WARNING with a given logger and message template passes; the
+    same warning is then suppressed for interval seconds. What was skipped
+    is reported as a `suppressed` count, on the first repeat after the
+    window if one comes before the next flush, otherwise on a summary
+    record returned by flush. At most MAX_KEYS windows are kept.
+    """
+
+    MAX_KEYS = 10000
+
+    def __init__(self, interval: float, clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.interval = interval
+        self.clock = clock
+        self.suppressed = 0
+        # (logger, template) -> (window start, suppressed in window), oldest
+        # window first
+        self._windows: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        # Counts of windows forgotten before they were reported
+        self._closed: List[Tuple[Tuple[str, str], int]] = []
+        self._lock = threading.Lock()
+
+    def _forget(self, key: Tuple[str, str]) -> None:
+        _, count = self._windows.pop(key)
+        if count:
+            self._closed.append((key, count))
+
+    def _prune(self, now: float) -> None:
+        # Windows are ordered by start, so the closed ones come first
+        while self._windows:
+            key, (start, _) = next(iter(self._windows.items()))
+            if now - start < self.interval and len(self._windows) < self.MAX_KEYS:
+                break
+            self._forget(key)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.WARNING or self.interval <= 0:
+            return True
+
+        key = (record.name, str(record.msg))
+        now = self.clock()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is not None and now - window[0] < self.interval:
+                self._windows[key] = (window[0], window[1] + 1)
+                self.suppressed += 1
+                LOG_RECORDS_SUPPRESSED.inc()
+                return False
+            if window is not None:
+                del self._windows[key]
+            self._prune(now)
+            self._windows[key] = (now, 0)
+
+        if window is not None and window[1]:
+            record.suppressed = window[1]
+            record.msg = f"{record.msg} ({window[1]} similar suppressed)"
+        return True
+
+    def flush(self, final: bool = False) -> List[logging.LogRecord]:
+        """
+        Summary records for the suppressed warnings of closed windows, or of
+        every window when final
+        """
+        with self._lock:
+            if final:
+                for key in list(self._windows):
+                    self._forget(key)
+            else:
+                self._prune(self.clock())
+            closed, self._closed = self._closed, []
+
+        records = []
+        for (name, msg), count in closed:
+            record = logging.LogRecord(
+                name,
+                logging.WARNING,
+                __file__,
+                0,
+                f"{msg} ({count} similar suppressed)",
+                None,
+                None,
+            )
+            record.suppressed = count
+            records.append(record)
+        return records
@@ -1,84 +1,268 @@
-import json
+import atexit
+import copy
+import gzip
 import logging
+import os
+import queue
+import shutil
 import sys
+import threading
 
 # Request logging middleware
 import time
-from datetime import datetime, timezone
+from contextvars import ContextVar
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+    TimedRotatingFileHandler,
+)
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.config import settings
+from app.utils.formatters import JSONFormatter
+from app.utils.log_filters import DedupFilter, SamplingFilter
+from app.utils.metrics import LOG_RECORDS_DROPPED
+from app.utils.query_stats import server_timing, track_queries
 
-class JSONFormatter(logging.Formatter):
-    """Custom JSON formatter for structured logging"""
 
-    def format(self, record: logging.LogRecord) -> str:
-        log_entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat() + "Z",
-            "level": record.levelname,
-            "logger": record.name,
-            "message": record.getMessage(),
-            "module": record.module,
-            "function": record.funcName,
-            "line": record.lineno,
-        }
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler feeding a bounded queue.
 
-        # Add exception info if present
+    When the queue is full, records are dropped and counted ("drop" policy)
+    or the logging call waits for room ("block" policy).
+    """
+
+    def __init__(self, log_queue: queue.Queue, block: bool = False):
+        super().__init__(log_queue)
+        self.block = block
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message and traceback now, while args and frames are
+        # still current; extras are left on the record for the formatter
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
         if record.exc_info:
-            log_entry["exception"] = self.formatException(record.exc_info)
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
 
-        # Add extra fields
-        if hasattr(record, 'user_id'):
-            log_entry["user_id"] = record.user_id
-        if hasattr(record, 'request_id'):
-            log_entry["request_id"] = record.request_id
-        if hasattr(record, 'endpoint'):
-            log_entry["endpoint"] = record.endpoint
-        if hasattr(record, 'method'):
-            log_entry["method"] = record.method
-        if hasattr(record, 'status_code'):
-            log_entry["status_code"] = record.status_code
-        if hasattr(record, 'response_time'):
-            log_entry["response_time"] = record.response_time
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.block:
+            self.queue.put(record)
+        else:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+                LOG_RECORDS_DROPPED.inc()
+                return
+        self.enqueued += 1
 
-        return json.dumps(log_entry, ensure_ascii=False)
 
+class DrainingQueueListener(QueueListener):
+    """
+    QueueListener that can stop while its bounded queue is full.
 
-def setup_logging() -> None:
-    """Configure application logging"""
+    The stock listener enqueues its stop sentinel with put_nowait, which
+    raises queue.Full exactly when a flood has filled the queue; this one
+    waits for the thread to make room instead.
+    """
 
-    # Create logs directory
-    logs_dir = Path("logs")
-    logs_dir.mkdir(exist_ok=True)
+    SENTINEL_TIMEOUT = 1.0
 
-    # Root logger configuration
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
+    def enqueue_sentinel(self) -> None:
+        while True:
+            try:
+                self.queue.put(self._sentinel, timeout=self.SENTINEL_TIMEOUT)
+                return
+            except queue.Full:
+                # Without a running thread nothing would drain the queue,
+                # and there is nothing left to stop
+                thread = self._thread
+                if thread is None or not thread.is_alive():
+                    return
+
+
+class StdoutHandler(logging.StreamHandler):
+    """
+    StreamHandler for whatever sys.stdout is when a record is written, so
+    records flushed at exit (e.g. dedup summaries) do not go to a stream
+    that was swapped in and closed since setup, as test output capture does.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(sys.stdout)
+
+    @property  # type: ignore[override]
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value) -> None:
+        pass
+
+
+class DedupSummaryThread(threading.Thread):
+    """
+    Reports the warnings a DedupFilter suppressed once their window closes,
+    so the count of the last window of a burst is not lost.
+    """
+
+    def __init__(self, handler: logging.Handler, dedup: DedupFilter):
+        super().__init__(name="log-dedup-summary", daemon=True)
+        self.handler = handler
+        self.dedup = dedup
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.dedup.interval):
+            self.emit_summaries()
+
+    def emit_summaries(self, final: bool = False) -> None:
+        # emit, not handle: summaries must not go through the filters again
+        for record in self.dedup.flush(final):
+            self.handler.emit(record)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+        self.emit_summaries(final=True)
+
+
+_traceback_formatter = logging.Formatter()
+
+# Pipeline started by setup_logging
+_queue_handler: Optional[BoundedQueueHandler] = None
+_listener: Optional[DrainingQueueListener] = None
+_dedup_summaries: Optional[DedupSummaryThread] = None
+
+
+def _gzip_namer(name: str) -> str:
+    return f"{name}.gz"
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def _log_path(logs_dir: Path, name: str) -> Path:
+    # Rotation needs a single owner per file: with several workers, each one
+    # writes and rotates its own files
+    if settings.log_file_per_process:
+        return logs_dir / f"{name}.{os.getpid()}.log"
+    return logs_dir / f"{name}.log"
+
+
+def _file_handler(path: Path, level: int) -> logging.Handler:
+    handler: logging.Handler
+    if settings.log_rotation == "time":
+        handler = TimedRotatingFileHandler(
+            path,
+            when=settings.log_rotation_when,
+            backupCount=settings.log_backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+    else:
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=settings.log_max_bytes,
+            backupCount=settings.log_backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+    if settings.log_compress:
+        handler.namer = _gzip_namer
+        handler.rotator = _gzip_rotator
+    handler.setLevel(level)
+    handler.setFormatter(JSONFormatter())
+    return handler
+
+
+QUERY_PLANS_LOGGER = "app.query_plans"
+
+
+def _exclude_query_plans(record: logging.LogRecord) -> bool:
+    return not record.name.startswith(QUERY_PLANS_LOGGER)
 
-    # Clear existing handlers
-    root_logger.handlers.clear()
+
+def setup_logging(logs_dir: Optional[Path] = None) -> None:
+    """
+    Configure application logging.
+
+    Loggers only put records on a bounded queue; a listener thread formats
+    them and does the console and file I/O, so logging never writes to disk
+    on the event loop.
+    """
+    global _queue_handler, _listener, _dedup_summaries
+
+    shutdown_logging()
+
+    # Create logs directory
+    logs_dir = logs_dir or Path(settings.log_dir)
+    logs_dir.mkdir(parents=True, exist_ok=True)
 
     # Console handler with JSON formatting
-    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler = StdoutHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(JSONFormatter())
 
-    # File handler for all logs
-    file_handler = logging.FileHandler(logs_dir / "app.log", encoding="utf-8")
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(JSONFormatter())
+    # Rotated files for all logs and for errors
+    file_handler = _file_handler(_log_path(logs_dir, "app"), logging.INFO)
+    error_handler = _file_handler(_log_path(logs_dir, "errors"), logging.ERROR)
 
-    # Error file handler
-    error_handler = logging.FileHandler(logs_dir / "errors.log", encoding="utf-8")
-    error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(JSONFormatter())
+    # Slow query plans are long: they only go to their own file
+    plans_handler = _file_handler(_log_path(logs_dir, "query_plans"), logging.INFO)
+    plans_handler.addFilter(logging.Filter(QUERY_PLANS_LOGGER))
+    for handler in (console_handler, file_handler):
+        handler.addFilter(_exclude_query_plans)
+
+    _queue_handler = BoundedQueueHandler(
+        queue.Queue(maxsize=settings.log_queue_size),
+        block=settings.log_queue_policy == "block",
+    )
+    # Filtered before the record is copied and queued
+    _queue_handler.addFilter(
+        SamplingFilter(
+            settings.log_sample_rates,
+            slow_threshold=settings.log_slow_request_threshold,
+        )
+    )
+    dedup = DedupFilter(settings.log_dedup_interval)
+    _queue_handler.addFilter(dedup)
+    _listener = DrainingQueueListener(
+        _queue_handler.queue,
+        console_handler,
+        file_handler,
+        error_handler,
+        plans_handler,
+        respect_handler_level=True,
+    )
+    _listener.start()
+    if dedup.interval > 0:
+        _dedup_summaries = DedupSummaryThread(_queue_handler, dedup)
+        _dedup_summaries.start()
+
+    # Root logger configuration
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
 
-    # Add handlers
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(error_handler)
+    # Clear existing handlers
+    root_logger.handlers.clear()
+    root_logger.addHandler(_queue_handler)
 
     # Set specific loggers
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
@@ -89,19 +273,92 @@ def setup_logging() -> None:
     app_logger.setLevel(logging.INFO)
 
 
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _queue_handler, _listener, _dedup_summaries
+
+    if _dedup_summaries is not None:
+        _dedup_summaries.stop()
+        _dedup_summaries = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+def get_log_stats() -> Dict[str, Any]:
+    """Counters of the logging queue"""
+    stats = {
+        "queued": 0,
+        "capacity": 0,
+        "enqueued": 0,
+        "dropped": 0,
+        "sampled_out": 0,
+        "suppressed": 0,
+    }
+    if _queue_handler is None:
+        return stats
+
+    stats.update(
+        queued=_queue_handler.queue.qsize(),
+        capacity=settings.log_queue_size,
+        enqueued=_queue_handler.enqueued,
+        dropped=_queue_handler.dropped,
+    )
+    for log_filter in _queue_handler.filters:
+        if isinstance(log_filter, SamplingFilter):
+            stats["sampled_out"] = log_filter.sampled_out
+        elif isinstance(log_filter, DedupFilter):
+            stats["suppressed"] = log_filter.suppressed
+    return stats
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance"""
     return logging.getLogger(f"app.{name}")
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for request/response logging"""
+# ID of the request being served, set by LoggingMiddleware
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class LoggingMiddleware:
+    """
+    Pure ASGI middleware for request/response logging.
+
+    Unlike BaseHTTPMiddleware it does not run the app in a separate task or
+    buffer the response through a memory stream, so streaming responses are
+    passed through untouched.
+
+    Database statements issued by the request are counted and timed. The
+    totals are logged with the completed request and, up to the start of the
+    response, sent in a Server-Timing header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next):
         start_time = time.time()
 
         # Generate request ID
         request_id = f"req_{int(time.time() * 1000)}"
+        request = Request(scope)
 
         # Log request
         logger = get_logger("requests")
@@ -110,32 +367,49 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             extra={
                 "request_id": request_id,
                 "method": request.method,
-                "endpoint": str(request.url.path),
+                "endpoint": request.url.path,
                 "query_params": str(request.query_params),
                 "client_ip": request.client.host if request.client else None,
                 "user_agent": request.headers.get("user-agent"),
             },
         )
 
-        # Process request
-        response = await call_next(request)
+        status_code = 500
 
-        # Calculate response time
-        response_time = time.time() - start_time
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Add request ID to response headers
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Request-ID", request_id)
+                if settings.server_timing:
+                    headers.append(
+                        "Server-Timing",
+                        server_timing(query_stats, time.time() - start_time),
+                    )
+            await send(message)
 
-        # Log response
-        logger.info(
-            "Request completed",
-            extra={
-                "request_id": request_id,
-                "method": request.method,
-                "endpoint": str(request.url.path),
-                "status_code": response.status_code,
-                "response_time": round(response_time, 4),
-            },
-        )
+        request_id_token = _request_id.set(request_id)
+        try:
+            with track_queries() as query_stats:
+                await self.app(scope, receive, send_with_request_id)
+        finally:
+            _request_id.reset(request_id_token)
 
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
+            # Calculate response time, including the streamed body
+            response_time = time.time() - start_time
 
-        return response
+            # Log response
+            logger.info(
+                "Request completed",
+                extra={
+                    "request_id": request_id,
+                    "method": request.method,
+                    "endpoint": request.url.path,
+                    "status_code": status_code,
+                    "response_time": round(response_time, 4),
+                    "db_queries": query_stats.count,
+                    "db_time": round(query_stats.duration, 4),
+                },
+            )
@@ -0,0 +1,196 @@
+"""
+Prometheus metrics.
+
+Metrics are updated where the events happen and exposed in the Prometheus
+text format. When PROMETHEUS_MULTIPROC_DIR is set (e.g. with several uvicorn
+workers), every worker writes its values to files in that directory and a
+scrape served by any worker aggregates all of them.
+"""
+
+import os
+import time
+from typing import Sequence
+
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# HTTP
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route template",
+    ["method", "route"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# Rate limiting
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected by the rate limiter, by key type (ip or user)",
+    ["policy"],
+)
+
+# Database
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time by statement type",
+    ["operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts",
+    "Checkouts that timed out waiting for a connection",
+)
+
+# In-process caches
+CACHE_LOOKUPS = Counter(
+    "cache_lookups",
+    "Cache lookups by cache (token or user_profile) and result (hit or miss)",
+    ["cache", "result"],
+)
+
+# Password hashing
+PASSWORD_HASH_IN_FLIGHT = Gauge(
+    "password_hash_in_flight",
+    "Hashing jobs running or queued",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "Hashing jobs waiting for a worker",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected", "Hashing jobs rejected (pool full)"
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Hashing and verification latency, queueing included",
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 1, 2.5, 5, 10),
+)
+
+# Logging pipeline
+LOG_QUEUE_DEPTH = Gauge(
+    "log_queue_depth",
+    "Log records waiting for the writer thread",
+    multiprocess_mode="livesum",
+)
+LOG_RECORDS_DROPPED = Counter("log_records_dropped", "Log records dropped (queue full)")
+LOG_RECORDS_SAMPLED_OUT = Counter(
+    "log_records_sampled_out", "Log records skipped by sampling"
+)
+LOG_RECORDS_SUPPRESSED = Counter(
+    "log_records_suppressed", "Repeated warnings suppressed"
+)
+
+# Host, from the background health sampler
+SYSTEM_CPU_PERCENT = Gauge(
+    "system_cpu_percent", "CPU usage percentage", multiprocess_mode="mostrecent"
+)
+SYSTEM_MEMORY_PERCENT = Gauge(
+    "system_memory_percent", "Memory usage percentage", multiprocess_mode="mostrecent"
+)
+SYSTEM_DISK_PERCENT = Gauge(
+    "system_disk_percent", "Disk usage percentage", multiprocess_mode="mostrecent"
+)
+
+
+def is_multiprocess() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def generate_metrics() -> bytes:
+    """Current metrics in the Prometheus text format"""
+    if is_multiprocess():
+        # A fresh registry per scrape, reading the files of every worker
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def metrics_response() -> Response:
+    return Response(content=generate_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead() -> None:
+    """Drop the live gauges of this worker, called on shutdown"""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def get_route_label(scope: Scope) -> str:
+    """Path template of the matched route, so ids do not explode cardinality"""
+    route = scope.get("route")
+    if route is None and "app" in scope:
+        # Not routed, e.g. rejected by a middleware: match the routes here
+        for candidate in scope["app"].router.routes:
+            if candidate.matches(scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request counts, latency and in-flight"""
+
+    def __init__(self, app: ASGIApp, exclude_paths: Sequence[str] = ()):
+        self.app = app
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start_time = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            route = get_route_label(scope)
+            HTTP_REQUEST_DURATION.labels(method, route).observe(
+                time.perf_counter() - start_time
+            )
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
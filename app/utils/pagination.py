@@ -0,0 +1,193 @@
+"""
+Pagination helpers for task listings (offset and keyset/cursor modes)
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import ColumnElement, Select, and_, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app import models
+
+# Listing order shared by every paginated endpoint. The id tie-breaker makes the
+# order total so a (created_at, id) cursor identifies an exact position.
+TASK_ORDER = (models.Task.created_at.desc(), models.Task.id.desc())
+
+# How the total of a paginated listing is computed
+CountMode = Literal["exact", "window", "estimate", "none"]
+
+
+def encode_cursor(created_at: datetime, task_id: int) -> str:
+    """Encode the position of a task as an opaque cursor"""
+    payload = json.dumps([created_at.isoformat(), task_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+    Raises HTTPException 400 if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) wrapper around a SELECT"""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select[Any]):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler: Any, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def count_tasks(
+    db: AsyncSession, conditions: Sequence[ColumnElement[bool]]
+) -> int:
+    """Exact number of tasks matching the conditions"""
+    result = await db.execute(
+        select(func.count(models.Task.id)).where(and_(*conditions))
+    )
+    total: int = result.scalar_one()
+    return total
+
+
+async def estimate_tasks(
+    db: AsyncSession, conditions: Sequence[ColumnElement[bool]]
+) -> int:
+    """
+    Planner row estimate for the conditions.
+    Only PostgreSQL exposes one; other databases fall back to an exact count.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return await count_tasks(db, conditions)
+
+    result = await db.execute(_Explain(select(models.Task.id).where(and_(*conditions))))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def fetch_task_page(
+    db: AsyncSession,
+    conditions: Sequence[ColumnElement[bool]],
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    count: CountMode = "exact",
+    order_by: Optional[Sequence[ColumnElement[Any]]] = None,
+    exact_total: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Fetch one page of tasks matching the given conditions.
+
+    With a cursor, rows are located by (created_at, id) so the cost does not
+    grow with the page number; otherwise classic offset pagination is used.
+
+    The count mode decides how `total` is obtained:
+    exact (separate COUNT query), window (COUNT(*) OVER () in the page query),
+    estimate (planner estimate) or none (no total, only has_more).
+
+    A custom order_by (e.g. search relevance) is only supported with offsets,
+    since cursors encode a (created_at, id) position.
+
+    An exact_total already known to the caller (e.g. from the listing ETag
+    query) replaces the COUNT query in exact mode.
+    """
+    if cursor and skip:
+        raise HTTPException(
+            status_code=400, detail="Use either 'skip' or 'cursor', not both"
+        )
+    if cursor and order_by is not None:
+        raise HTTPException(
+            status_code=400, detail="Cursor pagination requires created_at ordering"
+        )
+    order = order_by if order_by is not None else TASK_ORDER
+
+    total: Optional[int] = None
+    if count == "exact":
+        total = (
+            exact_total
+            if exact_total is not None
+            else await count_tasks(db, conditions)
+        )
+    elif count == "estimate":
+        total = await estimate_tasks(db, conditions)
+
+    if count == "window" and cursor:
+        # The window must run over the full filtered set, before the cursor
+        # seek, so the page is selected from a subquery
+        subq = (
+            select(models.Task, func.count().over().label("total_count"))
+            .where(and_(*conditions))
+            .subquery()
+        )
+        task_alias = aliased(models.Task, subq)
+        created_at, task_id = decode_cursor(cursor)
+        stmt = (
+            select(task_alias, subq.c.total_count)
+            .where(tuple_(subq.c.created_at, subq.c.id) < tuple_(created_at, task_id))
+            .order_by(subq.c.created_at.desc(), subq.c.id.desc())
+        )
+    elif count == "window":
+        stmt = (
+            select(models.Task, func.count().over().label("total_count"))
+            .where(and_(*conditions))
+            .order_by(*order)
+        )
+    else:
+        page_conditions = list(conditions)
+        if cursor:
+            created_at, task_id = decode_cursor(cursor)
+            page_conditions.append(
+                tuple_(models.Task.created_at, models.Task.id)
+                < tuple_(created_at, task_id)
+            )
+        stmt = select(models.Task).where(and_(*page_conditions)).order_by(*order)
+
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(stmt.offset(skip).limit(limit + 1))
+    rows = result.all()
+    tasks = [row[0] for row in rows]
+
+    if count == "window":
+        if rows:
+            total = rows[0].total_count
+        elif skip or cursor:
+            # Past the end of the listing: no row carries the window count
+            total = await count_tasks(db, conditions)
+        else:
+            total = 0
+
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+    next_cursor = (
+        encode_cursor(tasks[-1].created_at, tasks[-1].id) if has_more else None
+    )
+
+    return {
+        "tasks": tasks,
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
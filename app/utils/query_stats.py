@@ -0,0 +1,72 @@
+"""
+Per-request database query accounting.
+
+Engine events (see app.database) report every statement to the QueryStats
+active in the current context: the one LoggingMiddleware opens for each
+request, plus any opened around a block with track_queries or query_budget.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+
+@dataclass
+class QueryStats:
+    """Statements issued and time spent in the database"""
+
+    count: int = 0
+    duration: float = 0.0  # seconds
+    statements: Optional[List[str]] = None  # only kept when asked for
+
+
+# Nested blocks each get every statement, so a test can wrap a request that
+# the middleware is also counting
+_active: ContextVar[Tuple[QueryStats, ...]] = ContextVar("query_stats", default=())
+
+
+def record_query(statement: str, duration: float) -> None:
+    for stats in _active.get():
+        stats.count += 1
+        stats.duration += duration
+        if stats.statements is not None:
+            stats.statements.append(statement)
+
+
+@contextmanager
+def track_queries(keep_statements: bool = False) -> Iterator[QueryStats]:
+    """Count the statements issued inside the block"""
+    stats = QueryStats(statements=[] if keep_statements else None)
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Fail when the block issues more than max_queries statements.
+
+    Meant for tests, to catch N+1 regressions:
+
+        with query_budget(3):
+            response = await client.get("/api/v1/tasks/")
+    """
+    with track_queries(keep_statements=True) as stats:
+        yield stats
+    if stats.count > max_queries:
+        statements = "\n".join(f"  {statement}" for statement in stats.statements or [])
+        raise AssertionError(
+            f"{stats.count} queries issued, budget is {max_queries}:\n{statements}"
+        )
+
+
+def server_timing(stats: QueryStats, total: float) -> str:
+    """Server-Timing header value, durations in milliseconds"""
+    return (
+        f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", '
+        f"total;dur={total * 1000:.2f}"
+    )
@@ -0,0 +1,326 @@
+"""
+Rate limit storage backends.
+
+- memory: per-process state, for a single worker.
+- redis: state in Redis, updated by an atomic Lua script; shared by every
+  worker and host.
+- shm: state in a memory-mapped file, shared by the workers of one host.
+
+All backends use GCRA (generic cell rate algorithm), which keeps a
+single timestamp per key: the theoretical arrival time (TAT) of the next
+request. A key whose TAT is in the past has its full allowance again, so
+expired state can be dropped or overwritten at any time.
+"""
+
+import asyncio
+import contextlib
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.logging import get_logger
+
+logger = get_logger("rate_limiting")
+
+RateLimitInfo = Dict[str, Any]
+
+
+class RateLimitBackend(ABC):
+    """Storage and algorithm behind the rate limiter"""
+
+    @abstractmethod
+    async def is_allowed(
+        self, key: str, limit: int, window_seconds: int, cost: int = 1
+    ) -> Tuple[bool, RateLimitInfo]:
+        """
+        Charge cost units to key and check them against the limit.
+
+        Returns:
+            Tuple of (is_allowed, rate_limit_info) where the info holds limit,
+            remaining, reset_time (epoch seconds) and retry_after (seconds).
+        """
+
+    async def start(self) -> None:
+        """Start background work, called from the application lifespan"""
+
+    async def close(self) -> None:
+        """Release connections or files held by the backend"""
+
+
+def gcra_update(
+    tat: float, now: float, limit: int, window_seconds: int, cost: int = 1
+) -> Tuple[bool, float]:
+    """
+    Apply a request costing cost units to a stored TAT.
+
+    Returns (allowed, tat) where tat is the value to store: advanced by cost
+    emission intervals if allowed, unchanged otherwise.
+    """
+    interval = window_seconds / limit
+    new_tat = max(tat, now) + interval * cost
+    if new_tat - now > window_seconds:
+        return False, tat
+    return True, new_tat
+
+
+def gcra_info(
+    allowed: bool,
+    tat: float,
+    now: float,
+    limit: int,
+    window_seconds: int,
+    cost: int = 1,
+) -> RateLimitInfo:
+    """Rate limit info for a key whose stored TAT is tat"""
+    interval = window_seconds / limit
+    used = max(tat - now, 0.0)
+    remaining = max(0, int((window_seconds - used) / interval + 1e-9))
+    retry_after = 0
+    if not allowed:
+        retry_after = max(1, math.ceil(used + interval * cost - window_seconds))
+    return {
+        "limit": limit,
+        "remaining": remaining,
+        "reset_time": max(tat, now),
+        "retry_after": retry_after,
+    }
+
+
+class InMemoryBackend(RateLimitBackend):
+    """
+    GCRA in process memory: one TAT float per key.
+
+    Keys are spread over shards (plain dicts). Updates never await, so they
+    are atomic on the event loop and need no lock. A background task sweeps
+    one shard at a time, dropping keys whose TAT has passed, and each shard
+    is capped so memory stays bounded even between sweeps.
+    """
+
+    def __init__(
+        self,
+        max_keys: int = 1_000_000,
+        shards: int = 64,
+        sweep_interval: float = 60,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.shards: List[Dict[str, float]] = [{} for _ in range(shards)]
+        self.shard_max_keys = max(1, max_keys // shards)
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self.evicted = 0
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def _sweep_shard(self, shard: Dict[str, float], now: float) -> None:
+        expired = [key for key, tat in shard.items() if tat <= now]
+        for key in expired:
+            del shard[key]
+        self.evicted += len(expired)
+
+    async def sweep(self) -> None:
+        """Drop every expired key, yielding to the event loop between shards"""
+        for shard in self.shards:
+            self._sweep_shard(shard, self.clock())
+            await asyncio.sleep(0)
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await self.sweep()
+
+    async def start(self) -> None:
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_forever())
+
+    async def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweeper
+            self._sweeper = None
+
+    async def is_allowed(
+        self, key: str, limit: int, window_seconds: int, cost: int = 1
+    ) -> Tuple[bool, RateLimitInfo]:
+        now = self.clock()
+        shard = self.shards[hash(key) % len(self.shards)]
+        tat = shard.get(key, now)
+
+        allowed, tat = gcra_update(tat, now, limit, window_seconds, cost)
+        if allowed:
+            if key not in shard and len(shard) >= self.shard_max_keys:
+                self._sweep_shard(shard, now)
+                if len(shard) >= self.shard_max_keys:
+                    # Still full of active keys: forget the oldest one, which
+                    # at worst gives it a fresh allowance
+                    del shard[next(iter(shard))]
+                    self.evicted += 1
+            shard[key] = tat
+        return allowed, gcra_info(allowed, tat, now, limit, window_seconds, cost)
+
+
+# KEYS[1]: rate limit key; ARGV: limit, window in seconds, cost.
+# Uses the Redis clock so every client agrees on "now". Times are integer
+# microseconds, which doubles represent exactly.
+GCRA_LUA = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2]) * 1000000
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000000 + tonumber(clock[2])
+local interval = window / limit
+local cost = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+local new_tat = math.max(tat, now) + interval * cost
+if new_tat - now > window then
+    return {0, string.format('%.0f', tat), string.format('%.0f', now)}
+end
+redis.call('SET', KEYS[1], string.format('%.0f', new_tat),
+    'PX', math.ceil((new_tat - now) / 1000))
+return {1, string.format('%.0f', new_tat), string.format('%.0f', now)}
+"""
+
+
+class RedisBackend(RateLimitBackend):
+    """GCRA in Redis, shared by every worker and host"""
+
+    def __init__(self, url: str, prefix: str = "ratelimit", client: Any = None):
+        if client is None:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as e:  # pragma: no cover
+                raise RuntimeError(
+                    "The redis rate limit backend requires the 'redis' package"
+                ) from e
+            client = Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        # Sent with EVALSHA, falling back to EVAL if the server lost the script
+        self.script = client.register_script(GCRA_LUA)
+
+    async def is_allowed(
+        self, key: str, limit: int, window_seconds: int, cost: int = 1
+    ) -> Tuple[bool, RateLimitInfo]:
+        try:
+            allowed, tat, now = await self.script(
+                keys=[f"{self.prefix}:{key}"], args=[limit, window_seconds, cost]
+            )
+        except Exception:
+            # Fail open: a limiter outage should not take the API down
+            logger.warning("Rate limit backend unavailable", exc_info=True)
+            return True, {
+                "limit": limit,
+                "remaining": limit,
+                "reset_time": time.time(),
+                "retry_after": 0,
+            }
+        # Report times against the Redis clock, converted to epoch seconds
+        return bool(allowed), gcra_info(
+            bool(allowed),
+            float(tat) / 1_000_000,
+            float(now) / 1_000_000,
+            limit,
+            window_seconds,
+            cost,
+        )
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class SharedMemoryBackend(RateLimitBackend):
+    """
+    GCRA in a memory-mapped file, shared by the worker processes of one host.
+
+    The file is a fixed hash table of (key hash, TAT) slots split into
+    stripes. A key only probes the slots of its own stripe, and each stripe
+    is guarded by an fcntl byte-range lock, so workers only contend when
+    their keys share a stripe. When a stripe is full the slot with the
+    oldest TAT is reused, which at worst gives that key a fresh allowance.
+    """
+
+    SLOT = struct.Struct("<Qd")
+    STRIPE_SLOTS = 16
+
+    def __init__(self, path: str, slots: int):
+        self.stripes = max(1, slots // self.STRIPE_SLOTS)
+        self.size = self.stripes * self.STRIPE_SLOTS * self.SLOT.size
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size < self.size:
+            os.ftruncate(self.fd, self.size)
+        self.map = mmap.mmap(self.fd, self.size)
+
+    def _hash(self, key: str) -> int:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        # 0 marks an empty slot
+        return int.from_bytes(digest, "little") or 1
+
+    def _update(
+        self, key: str, limit: int, window_seconds: int, cost: int
+    ) -> Tuple[bool, float, float]:
+        key_hash = self._hash(key)
+        stripe_size = self.STRIPE_SLOTS * self.SLOT.size
+        start = (key_hash % self.stripes) * stripe_size
+
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, stripe_size, start)
+        try:
+            now = time.time()
+            target = None
+            oldest_offset, oldest_tat = start, math.inf
+            for offset in range(start, start + stripe_size, self.SLOT.size):
+                slot_hash, slot_tat = self.SLOT.unpack_from(self.map, offset)
+                if slot_hash == key_hash:
+                    target, tat = offset, slot_tat
+                    break
+                if slot_hash == 0 or slot_tat <= now:
+                    # Empty or expired: reusable
+                    if target is None:
+                        target, tat = offset, now
+                elif slot_tat < oldest_tat:
+                    oldest_offset, oldest_tat = offset, slot_tat
+            if target is None:
+                target, tat = oldest_offset, now
+
+            allowed, tat = gcra_update(tat, now, limit, window_seconds, cost)
+            if allowed:
+                self.SLOT.pack_into(self.map, target, key_hash, tat)
+            return allowed, tat, now
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, stripe_size, start)
+
+    async def is_allowed(
+        self, key: str, limit: int, window_seconds: int, cost: int = 1
+    ) -> Tuple[bool, RateLimitInfo]:
+        # The critical section is a few memory reads and writes, short enough
+        # to run on the event loop
+        allowed, tat, now = self._update(key, limit, window_seconds, cost)
+        return allowed, gcra_info(allowed, tat, now, limit, window_seconds, cost)
+
+    async def close(self) -> None:
+        self.map.close()
+        os.close(self.fd)
+
+
+def create_rate_limit_backend(backend: Optional[str] = None) -> RateLimitBackend:
+    """Build the backend selected by settings.rate_limit_backend"""
+    backend = backend or settings.rate_limit_backend
+    if backend == "redis":
+        return RedisBackend(settings.rate_limit_redis_url)
+    if backend == "shm":
+        return SharedMemoryBackend(
+            settings.rate_limit_shm_path, settings.rate_limit_shm_slots
+        )
+    if backend == "memory":
+        return InMemoryBackend(
+            max_keys=settings.rate_limit_memory_max_keys,
+            sweep_interval=settings.rate_limit_sweep_interval,
+        )
+    raise ValueError(f"Unknown rate limit backend: {backend}")
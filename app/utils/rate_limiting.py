@@ -1,75 +1,25 @@
 """
-Rate limiting utilities using in-memory storage
+Rate limiting utilities; state lives in the backend selected by settings
 """
 
-import asyncio
-import time
-from collections import defaultdict, deque
-from typing import Dict
+from dataclasses import dataclass
+from typing import Any, Dict, Sequence, Tuple
 
 from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-# Rate limiting middleware
-from starlette.middleware.base import BaseHTTPMiddleware
-
+from app.utils.auth import decode_access_token
 from app.utils.logging import get_logger
+from app.utils.metrics import RATE_LIMIT_REJECTIONS
+from app.utils.rate_limit_backends import create_rate_limit_backend
 
 logger = get_logger("rate_limiting")
 
 
-class RateLimiter:
-    """In-memory rate limiter using sliding window"""
-
-    def __init__(self):
-        self.requests: Dict[str, deque] = defaultdict(deque)
-        self.lock = asyncio.Lock()
-
-    async def is_allowed(
-        self, key: str, limit: int, window_seconds: int
-    ) -> tuple[bool, Dict[str, int]]:
-        """
-        Check if request is allowed based on rate limit.
-
-        Args:
-            key: Unique identifier (e.g., IP address, user ID)
-            limit: Maximum number of requests allowed
-            window_seconds: Time window in seconds
-
-        Returns:
-            Tuple of (is_allowed, rate_limit_info)
-        """
-        async with self.lock:
-            now = time.time()
-            window_start = now - window_seconds
-
-            # Clean old requests
-            requests = self.requests[key]
-            while requests and requests[0] < window_start:
-                requests.popleft()
-
-            # Check if limit exceeded
-            if len(requests) >= limit:
-                reset_time = requests[0] + window_seconds
-                return False, {
-                    "limit": limit,
-                    "remaining": 0,
-                    "reset_time": reset_time,
-                    "retry_after": int(reset_time - now),
-                }
-
-            # Add current request
-            requests.append(now)
-
-            return True, {
-                "limit": limit,
-                "remaining": limit - len(requests),
-                "reset_time": now + window_seconds,
-                "retry_after": 0,
-            }
-
-
 # Global rate limiter instance
-rate_limiter = RateLimiter()
+rate_limiter = create_rate_limit_backend()
 
 
 def get_client_ip(request: Request) -> str:
@@ -87,65 +37,206 @@ def get_client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Units a client may spend per window"""
+
+    limit: int
+    window_seconds: int
+
+
+@dataclass(frozen=True)
+class RouteCost:
+    """Units charged for requests whose path starts with path"""
+
+    path: str
+    cost: int
+    methods: Tuple[str, ...] = ("GET", "POST", "PUT", "PATCH", "DELETE")
+    search_cost: int = 0  # extra units when ?search= is given
+    rows_per_unit: int = 0  # one extra unit per this many rows asked via ?limit=
+
+    def matches(self, method: str, path: str) -> bool:
+        return method in self.methods and path.startswith(self.path)
+
+    def cost_for(self, request: Request) -> int:
+        cost = self.cost
+        if self.search_cost and request.query_params.get("search"):
+            cost += self.search_cost
+        if self.rows_per_unit:
+            try:
+                rows = int(request.query_params.get("limit", 0))
+            except ValueError:
+                rows = 0
+            cost += max(0, rows - 1) // self.rows_per_unit
+        return cost
+
+
+# First match wins; other requests cost 1 unit
+ROUTE_COSTS: Tuple[RouteCost, ...] = (
+    RouteCost("/api/v2/tasks/export", 50, methods=("GET",)),
+    RouteCost("/api/v2/tasks/import", 50, methods=("POST",)),
+    RouteCost("/api/v2/tasks/bulk", 10, methods=("POST",)),
+    RouteCost("/api/v2/tasks/stats", 5, methods=("GET",)),
+    RouteCost("/api/v2/tasks", 10, methods=("PATCH", "DELETE")),
+    RouteCost("/api/v1/tasks", 1, methods=("GET",), search_cost=4, rows_per_unit=100),
+    RouteCost("/api/v2/tasks", 1, methods=("GET",), search_cost=4, rows_per_unit=100),
+    # bcrypt runs on every login and registration
+    RouteCost("/api/v1/auth", 5, methods=("POST",)),
+    RouteCost("/api/v2/auth", 5, methods=("POST",)),
+)
+
+
+def get_request_cost(
+    request: Request, route_costs: Sequence[RouteCost] = ROUTE_COSTS
+) -> int:
+    """Units charged for a request by the first matching route cost"""
+    for route_cost in route_costs:
+        if route_cost.matches(request.method, request.url.path):
+            return route_cost.cost_for(request)
+    return 1
+
+
+def get_rate_limit_key(request: Request) -> Tuple[str, bool]:
+    """
+    Rate limit key of the client: the user id for requests with a valid
+    bearer token, the client IP otherwise.
+
+    Returns:
+        Tuple of (key, is_authenticated)
+    """
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        payload = decode_access_token(token)
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}", True
+    return f"ip:{get_client_ip(request)}", False
+
+
+def rate_limit_headers(rate_info: Dict[str, Any]) -> Dict[str, str]:
+    headers = {
+        "X-RateLimit-Limit": str(rate_info["limit"]),
+        "X-RateLimit-Remaining": str(rate_info["remaining"]),
+        "X-RateLimit-Reset": str(int(rate_info["reset_time"])),
+    }
+    if rate_info["retry_after"]:
+        headers["Retry-After"] = str(rate_info["retry_after"])
+    return headers
+
+
+async def hit_rate_limit(
+    request: Request, key: str, policy: RateLimitPolicy, cost: int = 1
+) -> Tuple[bool, Dict[str, Any]]:
+    """Charge cost units to key, logging when the limit is exceeded"""
+    # A request costing more than the whole budget could never pass
+    cost = min(cost, policy.limit)
+    is_allowed, rate_info = await rate_limiter.is_allowed(
+        key, policy.limit, policy.window_seconds, cost
+    )
+
+    if not is_allowed:
+        RATE_LIMIT_REJECTIONS.labels(key.partition(":")[0]).inc()
+        logger.warning(
+            "Rate limit exceeded",
+            extra={
+                "rate_limit_key": key,
+                "client_ip": get_client_ip(request),
+                "endpoint": str(request.url.path),
+                "cost": cost,
+                "rate_info": rate_info,
+            },
+        )
+
+    return is_allowed, rate_info
+
+
+def rate_limit_detail(rate_info: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "message": "Rate limit exceeded",
+        "retry_after": rate_info["retry_after"],
+        "limit": rate_info["limit"],
+    }
+
+
 async def check_rate_limit(
     request: Request,
     limit: int = 100,
     window_seconds: int = 3600,  # 1 hour
     key_prefix: str = "ip",
+    cost: int = 1,
 ) -> None:
     """
     Check rate limit and raise exception if exceeded.
 
     Args:
         request: FastAPI request object
-        limit: Maximum requests per window
+        limit: Maximum units per window
         window_seconds: Time window in seconds
         key_prefix: Prefix for rate limit key
+        cost: Units charged for this request
     """
-    client_ip = get_client_ip(request)
-    key = f"{key_prefix}:{client_ip}"
+    key = f"{key_prefix}:{get_client_ip(request)}"
+    policy = RateLimitPolicy(limit, window_seconds)
 
-    is_allowed, rate_info = await rate_limiter.is_allowed(key, limit, window_seconds)
+    is_allowed, rate_info = await hit_rate_limit(request, key, policy, cost)
 
     if not is_allowed:
-        logger.warning(
-            "Rate limit exceeded",
-            extra={
-                "client_ip": client_ip,
-                "endpoint": str(request.url.path),
-                "rate_info": rate_info,
-            },
-        )
-
         raise HTTPException(
             status_code=429,
-            detail={
-                "message": "Rate limit exceeded",
-                "retry_after": rate_info["retry_after"],
-                "limit": rate_info["limit"],
-            },
-            headers={
-                "X-RateLimit-Limit": str(rate_info["limit"]),
-                "X-RateLimit-Remaining": str(rate_info["remaining"]),
-                "X-RateLimit-Reset": str(int(rate_info["reset_time"])),
-                "Retry-After": str(rate_info["retry_after"]),
-            },
+            detail=rate_limit_detail(rate_info),
+            headers=rate_limit_headers(rate_info),
         )
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Middleware for global rate limiting"""
-
-    def __init__(self, app, calls: int = 100, period: int = 3600):
-        super().__init__(app)
-        self.calls = calls
-        self.period = period
-
-    async def dispatch(self, request: Request, call_next):
-        # Skip rate limiting for health checks
-        if request.url.path.startswith("/health"):
-            return await call_next(request)
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware for global rate limiting.
 
-        await check_rate_limit(request, limit=self.calls, window_seconds=self.period)
+    Authenticated users are limited per user and anonymous clients per IP.
+    Each request spends the units given by route_costs. Paths starting with
+    one of exempt_paths (health checks, metrics scrapes) are not limited.
+    """
 
-        return await call_next(request)
+    def __init__(
+        self,
+        app: ASGIApp,
+        calls: int = 100,
+        period: int = 3600,
+        user_calls: int = 1000,
+        user_period: int = 3600,
+        route_costs: Sequence[RouteCost] = ROUTE_COSTS,
+        exempt_paths: Sequence[str] = ("/health",),
+    ):
+        self.app = app
+        self.ip_policy = RateLimitPolicy(calls, period)
+        self.user_policy = RateLimitPolicy(user_calls, user_period)
+        self.route_costs = route_costs
+        self.exempt_paths = tuple(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        key, is_authenticated = get_rate_limit_key(request)
+        policy = self.user_policy if is_authenticated else self.ip_policy
+        cost = get_request_cost(request, self.route_costs)
+
+        is_allowed, rate_info = await hit_rate_limit(request, key, policy, cost)
+        headers = rate_limit_headers(rate_info)
+        if not is_allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": rate_limit_detail(rate_info)},
+                headers=headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,67 @@
+"""
+Full-text search expressions for task queries.
+
+PostgreSQL matches against the GIN-indexed `search_vector` column and SQLite
+against the FTS5 shadow table; other databases fall back to ILIKE.
+"""
+
+import re
+
+from sqlalchemy import ColumnElement, cast, false, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+
+from app import models
+from app.models.task_search import SEARCH_CONFIG, SEARCH_VECTOR_COLUMN, tasks_fts
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_search_vector = literal_column(f"tasks.{SEARCH_VECTOR_COLUMN}", type_=TSVECTOR)
+_fts_table = literal_column(tasks_fts.name)
+
+
+def _pg_query(term: str) -> ColumnElement[object]:
+    return func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), term)
+
+
+def _fts5_query(term: str) -> str:
+    # Quote every token so user input can never be parsed as FTS5 syntax
+    return " ".join(f'"{token}"' for token in _TOKEN_RE.findall(term))
+
+
+def search_condition(dialect_name: str, term: str) -> ColumnElement[bool]:
+    """WHERE clause matching tasks whose title or description contain the term"""
+    if dialect_name == "postgresql":
+        return _search_vector.op("@@")(_pg_query(term))
+
+    if dialect_name == "sqlite":
+        query = _fts5_query(term)
+        if not query:
+            return false()
+        return models.Task.id.in_(
+            select(tasks_fts.c.rowid).where(_fts_table.op("MATCH")(query))
+        )
+
+    return or_(
+        models.Task.title.ilike(f"%{term}%"),
+        models.Task.description.ilike(f"%{term}%"),
+    )
+
+
+def search_rank(dialect_name: str, term: str) -> ColumnElement[float]:
+    """Relevance score of a task for the term (higher is better)"""
+    if dialect_name == "postgresql":
+        return func.ts_rank_cd(_search_vector, _pg_query(term))
+
+    if dialect_name == "sqlite":
+        # bm25() is negative, with better matches further below zero. Column
+        # weights mirror the default PostgreSQL A (1.0) / B (0.4) weights.
+        return -(
+            select(func.bm25(_fts_table, 2.5, 1.0))
+            .where(
+                _fts_table.op("MATCH")(_fts5_query(term)),
+                tasks_fts.c.rowid == models.Task.id,
+            )
+            .scalar_subquery()
+        )
+
+    return literal_column("0")
@@ -0,0 +1,141 @@
+"""
+Slow query log.
+
+Statements slower than a threshold are logged with their SQL, redacted
+parameters, duration and the ID of the request that issued them. Optionally,
+a sample of slow SELECTs on PostgreSQL is run again under
+EXPLAIN (ANALYZE, BUFFERS) and the plan written to the query plan log.
+"""
+
+import hashlib
+import random
+from collections.abc import Mapping
+from typing import Any, Callable, Optional
+
+from app.config import settings
+from app.utils.logging import get_logger, get_request_id
+
+logger = get_logger("slow_queries")
+plan_logger = get_logger("query_plans")
+
+# Parameter types logged as they are; anything else may hold user data
+_SAFE_TYPES = (bool, int, float, type(None))
+
+
+def redact_value(value: Any) -> Any:
+    if isinstance(value, _SAFE_TYPES) or hasattr(value, "isoformat"):
+        return value
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """Parameters with strings, bytes and other payloads replaced by their type"""
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, Mapping):
+        return {key: redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_value(value) for value in parameters]
+    return redact_value(parameters)
+
+
+class SlowQueryLog:
+    """Logs statements at or above threshold seconds, called from engine events"""
+
+    def __init__(
+        self,
+        threshold: float,
+        explain: bool = False,
+        explain_sample_rate: float = 0.1,
+        random_fn: Callable[[], float] = random.random,
+    ):
+        self.threshold = threshold
+        self.explain = explain
+        self.explain_sample_rate = explain_sample_rate
+        self.random_fn = random_fn
+
+    def observe(
+        self,
+        conn: Any,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        duration: float,
+    ) -> None:
+        if self.threshold <= 0 or duration < self.threshold:
+            return
+
+        # Short hash of the SQL, so repeats of one statement can be grouped
+        query_id = hashlib.blake2b(statement.encode(), digest_size=4).hexdigest()
+        request_id = get_request_id()
+        # The id is part of the message so that duplicate suppression only
+        # collapses repeats of the same statement
+        logger.warning(
+            f"Slow query {query_id}",
+            extra={
+                "query_id": query_id,
+                "statement": statement,
+                "parameters": redact_parameters(parameters, executemany),
+                "duration": round(duration, 4),
+                "request_id": request_id,
+            },
+        )
+
+        if (
+            self.explain
+            and not executemany
+            and conn.dialect.name == "postgresql"
+            and statement.lstrip()[:6].lower() == "select"
+            and self.random_fn() < self.explain_sample_rate
+        ):
+            self._log_plan(conn, statement, parameters, query_id, request_id)
+
+    def _log_plan(
+        self,
+        conn: Any,
+        statement: str,
+        parameters: Any,
+        query_id: str,
+        request_id: Optional[str],
+    ) -> None:
+        # A raw DBAPI cursor does not fire engine events, and the savepoint
+        # keeps a failed EXPLAIN from aborting the caller's transaction.
+        # ANALYZE runs the SELECT a second time.
+        explain_cursor = conn.connection.cursor()
+        try:
+            explain_cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                explain_cursor.execute(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                )
+                plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+            except Exception:
+                explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                logger.warning(
+                    "Could not explain slow query",
+                    extra={"query_id": query_id},
+                    exc_info=True,
+                )
+                return
+            finally:
+                explain_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        finally:
+            explain_cursor.close()
+
+        plan_logger.info(
+            f"Query plan {query_id}",
+            extra={
+                "query_id": query_id,
+                "statement": statement,
+                "plan": plan,
+                "request_id": request_id,
+            },
+        )
+
+
+# Global slow query log instance
+slow_query_log = SlowQueryLog(
+    threshold=settings.db_slow_query_threshold,
+    explain=settings.db_slow_query_explain,
+    explain_sample_rate=settings.db_slow_query_explain_sample_rate,
+)
@@ -0,0 +1,42 @@
+"""
+Cache of verified access tokens.
+
+Clients send the same bearer token on every request, and both the rate
+limiter and get_current_user decode it. Verified payloads are kept in a
+bounded LRU keyed by the token's SHA-256 digest until the token's `exp`.
+Tokens that fail verification are never cached.
+"""
+
+import hashlib
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings
+from app.utils.cache import ExpiringLRUCache
+
+
+class TokenCache(ExpiringLRUCache[bytes, Dict[str, Any]]):
+    """Verified token payloads, each expiring at its `exp`"""
+
+    def __init__(self, max_size: int, clock: Callable[[], float] = time.time):
+        super().__init__("token", max_size, clock)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get_payload(self, token: str) -> Optional[Dict[str, Any]]:
+        """Cached payload of token, or None if unknown or expired"""
+        payload = self.get(self._key(token))
+        # Callers get their own copy to modify
+        return dict(payload) if payload is not None else None
+
+    def put_payload(self, token: str, payload: Dict[str, Any]) -> None:
+        """Remember a verified payload until its `exp` claim"""
+        expires_at = payload.get("exp", float("inf"))
+        if isinstance(expires_at, (int, float)):
+            self.put(self._key(token), dict(payload), expires_at)
+
+
+# Global token cache instance
+token_cache = TokenCache(settings.token_cache_size)
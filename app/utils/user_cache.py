@@ -0,0 +1,155 @@
+"""
+Cached user profiles.
+
+The token only carries the user's id and email (CurrentUser). Code that
+needs the rest of the profile goes through get_user_profile, which keeps
+profiles for settings.user_cache_ttl seconds. Any ORM update or delete of a
+user drops its entry, both when flushed and again after commit. Each drop
+also bumps an invalidation version, and a profile read from the database
+is only cached if its user was not invalidated since the read began, so a
+concurrent read of the old row cannot re-cache it. Other worker processes
+only see the change once their entry expires.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, object_session
+
+from app.config import settings
+from app.database import get_db
+from app.models import User
+from app.schemas.auth import CurrentUser, UserResponse
+from app.utils.auth import get_current_user
+from app.utils.cache import ExpiringLRUCache
+
+
+class UserProfileCache(ExpiringLRUCache[int, UserResponse]):
+    """User profiles by id, each kept for ttl seconds"""
+
+    def __init__(
+        self, ttl: float, max_size: int, clock: Callable[[], float] = time.time
+    ):
+        super().__init__("user_profile", max_size if ttl > 0 else 0, clock)
+        self.ttl = ttl
+        # Bumped by every invalidation. Per user, the version of its last
+        # invalidation; reads older than _cleared_version are all stale
+        self.version = 0
+        self._invalidated: OrderedDict[int, int] = OrderedDict()
+        self._cleared_version = 0
+
+    def get_profile(self, user_id: int) -> Optional[UserResponse]:
+        profile = self.get(user_id)
+        return profile.model_copy() if profile is not None else None
+
+    def put_profile(
+        self, profile: UserResponse, read_version: Optional[int] = None
+    ) -> None:
+        """
+        Cache a profile. One read from the database passes the version seen
+        before the read, and is skipped if the user was invalidated since.
+        """
+        with self._lock:
+            if read_version is not None and (
+                read_version < self._cleared_version
+                or read_version < self._invalidated.get(profile.id, 0)
+            ):
+                return
+            self.put(profile.id, profile.model_copy(), self.clock() + self.ttl)
+
+    def delete(self, key: int) -> None:
+        with self._lock:
+            super().delete(key)
+            self.version += 1
+            self._invalidated[key] = self.version
+            self._invalidated.move_to_end(key)
+            if len(self._invalidated) > max(self.max_size, 1):
+                # Forgetting a user's version makes every older read stale
+                _, version = self._invalidated.popitem(last=False)
+                self._cleared_version = max(self._cleared_version, version)
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self.version += 1
+            self._cleared_version = self.version
+            self._invalidated.clear()
+
+
+async def get_user_profile(db: AsyncSession, user_id: int) -> Optional[UserResponse]:
+    """Profile of a user, from the cache or the database"""
+    profile = user_profile_cache.get_profile(user_id)
+    if profile is None:
+        read_version = user_profile_cache.version
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is None:
+            return None
+        profile = UserResponse.model_validate(user)
+        user_profile_cache.put_profile(profile, read_version)
+    return profile
+
+
+async def get_current_user_profile(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> UserResponse:
+    """Dependency for the full profile of the authenticated user"""
+    profile = await get_user_profile(db, current_user.id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return profile
+
+
+# Invalidation
+
+# User ids to drop again after commit; None stands for every user
+_PENDING_KEY = "invalidated_user_ids"
+
+
+def _add_pending(session: Optional[Session], user_id: Optional[int]) -> None:
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(user_id)
+
+
+def _invalidate_user(mapper, connection, target: User) -> None:
+    user_profile_cache.delete(target.id)
+    _add_pending(object_session(target), target.id)
+
+
+def _invalidate_bulk_writes(orm_execute_state: ORMExecuteState) -> None:
+    # update(User) and delete(User) statements do not load the rows they
+    # change, so every profile is dropped
+    mapper = orm_execute_state.bind_mapper
+    if (
+        (orm_execute_state.is_update or orm_execute_state.is_delete)
+        and mapper is not None
+        and mapper.class_ is User
+    ):
+        user_profile_cache.clear()
+        _add_pending(orm_execute_state.session, None)
+
+
+def _invalidate_after_commit(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING_KEY, ())
+    if None in user_ids:
+        user_profile_cache.clear()
+        return
+    for user_id in user_ids:
+        user_profile_cache.delete(user_id)
+
+
+event.listen(User, "after_update", _invalidate_user)
+event.listen(User, "after_delete", _invalidate_user)
+event.listen(Session, "do_orm_execute", _invalidate_bulk_writes)
+event.listen(Session, "after_commit", _invalidate_after_commit)
+
+
+# Global user profile cache instance
+user_profile_cache = UserProfileCache(
+    ttl=settings.user_cache_ttl, max_size=settings.user_cache_size
+)
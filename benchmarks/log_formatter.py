@@ -0,0 +1,121 @@
+"""
+Microbenchmark of the JSON log formatter.
+
+Formats typical request and listing records with the previous formatter
+(datetime.now() plus a fixed list of hasattr checks) and with the current
+one using the json module and, when installed, orjson. The previous
+formatter drops the `filters` extra, so it also does less work.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:// SECRET_KEY=bench \\
+        python -m benchmarks.log_formatter --records 200000
+"""
+
+import argparse
+import json
+import logging
+import timeit
+from datetime import datetime, timezone
+
+from app.utils import formatters
+from app.utils.formatters import JSONFormatter
+
+
+class LegacyJSONFormatter(logging.Formatter):
+    """JSONFormatter before the rewrite"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat() + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+        }
+        if record.exc_info:
+            log_entry["exception"] = self.formatException(record.exc_info)
+        if hasattr(record, "user_id"):
+            log_entry["user_id"] = record.user_id
+        if hasattr(record, "request_id"):
+            log_entry["request_id"] = record.request_id
+        if hasattr(record, "endpoint"):
+            log_entry["endpoint"] = record.endpoint
+        if hasattr(record, "method"):
+            log_entry["method"] = record.method
+        if hasattr(record, "status_code"):
+            log_entry["status_code"] = record.status_code
+        if hasattr(record, "response_time"):
+            log_entry["response_time"] = record.response_time
+        return json.dumps(log_entry, ensure_ascii=False)
+
+
+def make_records():
+    logger = logging.getLogger("app.bench")
+    return [
+        logger.makeRecord(
+            "app.requests",
+            logging.INFO,
+            __file__,
+            1,
+            "Request completed",
+            None,
+            None,
+            extra={
+                "request_id": "req_1700000000000",
+                "method": "GET",
+                "endpoint": "/api/v2/tasks/",
+                "status_code": 200,
+                "response_time": 0.0123,
+            },
+        ),
+        logger.makeRecord(
+            "app.tasks_v2",
+            logging.INFO,
+            __file__,
+            1,
+            "Fetching tasks with filters",
+            None,
+            None,
+            extra={
+                "user_id": 42,
+                "filters": {
+                    "skip": 0,
+                    "limit": 100,
+                    "cursor": None,
+                    "count": "exact",
+                    "sort": "created_at",
+                    "completed": None,
+                    "search": "report",
+                },
+            },
+        ),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--records", type=int, default=200_000)
+    args = parser.parse_args()
+
+    records = make_records()
+    candidates = [("legacy", LegacyJSONFormatter(), None)]
+    candidates.append(("json", JSONFormatter(), formatters._dumps_json))
+    if formatters.orjson is not None:
+        candidates.append(("orjson", JSONFormatter(), formatters._dumps_orjson))
+
+    print(f"{'formatter':<10} {'us/record':>10} {'records/s':>12}")
+    for name, formatter, dumps in candidates:
+        if dumps is not None:
+            formatters.dumps = dumps
+        rounds = args.records // len(records)
+        elapsed = timeit.timeit(
+            lambda: [formatter.format(record) for record in records], number=rounds
+        )
+        per_record = elapsed / (rounds * len(records))
+        print(f"{name:<10} {per_record * 1e6:>10.2f} {1 / per_record:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
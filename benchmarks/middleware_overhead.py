@@ -0,0 +1,205 @@
+"""
+Per-request overhead of the logging and rate limit middleware.
+
+Compares the pure ASGI middleware against the previous BaseHTTPMiddleware
+versions on `/` and on a task listing. Requests are sent straight to the ASGI
+app, so no HTTP client or server cost is included; the listing reads from an
+in-memory SQLite database. Log records are created but not emitted, so the
+numbers are the middleware machinery rather than log I/O.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:// SECRET_KEY=bench \\
+        python -m benchmarks.middleware_overhead --requests 3000
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Callable, Dict, List, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app import models
+from app.api import api_router
+from app.database import get_db
+from app.utils.auth import create_access_token
+from app.utils.logging import LoggingMiddleware, get_logger
+from app.utils.rate_limiting import (
+    RateLimitMiddleware,
+    RateLimitPolicy,
+    get_rate_limit_key,
+    get_request_cost,
+    hit_rate_limit,
+    rate_limit_detail,
+    rate_limit_headers,
+)
+
+LIMIT = 10**9  # never reached during the benchmark
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """LoggingMiddleware before the pure ASGI rewrite"""
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        request_id = f"req_{int(time.time() * 1000)}"
+        logger = get_logger("requests")
+        logger.info(
+            "Request started",
+            extra={
+                "request_id": request_id,
+                "method": request.method,
+                "endpoint": str(request.url.path),
+                "query_params": str(request.query_params),
+                "client_ip": request.client.host if request.client else None,
+                "user_agent": request.headers.get("user-agent"),
+            },
+        )
+        response = await call_next(request)
+        logger.info(
+            "Request completed",
+            extra={
+                "request_id": request_id,
+                "method": request.method,
+                "endpoint": str(request.url.path),
+                "status_code": response.status_code,
+                "response_time": round(time.time() - start_time, 4),
+            },
+        )
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """RateLimitMiddleware before the pure ASGI rewrite"""
+
+    async def dispatch(self, request: Request, call_next):
+        key, _ = get_rate_limit_key(request)
+        cost = get_request_cost(request)
+        is_allowed, rate_info = await hit_rate_limit(
+            request, key, RateLimitPolicy(LIMIT, 3600), cost
+        )
+        if not is_allowed:
+            return JSONResponse(
+                status_code=429,
+                content={"detail": rate_limit_detail(rate_info)},
+                headers=rate_limit_headers(rate_info),
+            )
+        response = await call_next(request)
+        response.headers.update(rate_limit_headers(rate_info))
+        return response
+
+
+def build_app(stack: str, session_maker: Callable[[], AsyncSession]) -> FastAPI:
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+
+    @app.get("/")
+    def read_root():
+        return {"message": "Welcome to Task API"}
+
+    async def override_get_db():
+        async with session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    if stack == "base_http":
+        app.add_middleware(LegacyLoggingMiddleware)
+        app.add_middleware(LegacyRateLimitMiddleware)
+    elif stack == "pure_asgi":
+        app.add_middleware(LoggingMiddleware)
+        app.add_middleware(RateLimitMiddleware, calls=LIMIT, user_calls=LIMIT)
+    return app
+
+
+async def call(app: FastAPI, path: str, query: bytes, headers: List) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query,
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def seed(session_maker: Callable[[], AsyncSession], engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    async with session_maker() as session:
+        user = models.User(email="bench@example.com")
+        session.add(user)
+        await session.flush()
+        session.add_all(
+            [models.Task(title=f"Task {i}", user_id=user.id) for i in range(20)]
+        )
+        await session.commit()
+
+
+async def main(requests: int) -> None:
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    await seed(session_maker, engine)
+
+    token = create_access_token(data={"sub": "1"})
+    auth = [(b"authorization", f"Bearer {token}".encode())]
+    routes: Dict[str, Tuple[str, bytes, List]] = {
+        "/": ("/", b"", []),
+        "/api/v2/tasks/": ("/api/v2/tasks/", b"limit=20&count=none", auth),
+    }
+    stacks = ["none", "base_http", "pure_asgi"]
+
+    results: Dict[Tuple[str, str], float] = {}
+    for stack in stacks:
+        app = build_app(stack, session_maker)
+        for route, (path, query, headers) in routes.items():
+            # Warm up, then time
+            for _ in range(50):
+                assert await call(app, path, query, headers) == 200
+            started = time.perf_counter()
+            for _ in range(requests):
+                await call(app, path, query, headers)
+            results[stack, route] = (time.perf_counter() - started) / requests * 1e6
+
+    print(f"{'route':<18} {'stack':<10} {'us/request':>11} {'overhead us':>12}")
+    for route in routes:
+        for stack in stacks:
+            elapsed = results[stack, route]
+            overhead = elapsed - results["none", route]
+            print(f"{route:<18} {stack:<10} {elapsed:>11.1f} {overhead:>12.1f}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,113 @@
+"""
+Memory and throughput of the in-memory rate limiter under many distinct IPs.
+
+Every request comes from a new client IP and a simulated clock advances at
+--rate requests per second, so older clients go idle while new ones arrive.
+The GCRA backend drops idle keys and its memory levels off at the set of
+clients active within one emission interval; the previous sliding-window
+log (--compare) keeps a deque for every IP it has ever seen.
+
+Usage:
+    python -m benchmarks.rate_limit_memory --ips 3000000
+    python -m benchmarks.rate_limit_memory --ips 500000 --compare
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import time
+from collections import defaultdict, deque
+
+import psutil
+
+from app.utils.rate_limit_backends import InMemoryBackend
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SlidingWindowLog:
+    """The previous limiter: a deque of timestamps per key, never evicted"""
+
+    def __init__(self, clock):
+        self.requests = defaultdict(deque)
+        self.clock = clock
+
+    def __len__(self):
+        return len(self.requests)
+
+    async def is_allowed(self, key, limit, window_seconds):
+        now = self.clock()
+        requests = self.requests[key]
+        while requests and requests[0] < now - window_seconds:
+            requests.popleft()
+        if len(requests) >= limit:
+            return False, {}
+        requests.append(now)
+        return True, {}
+
+    async def sweep(self):
+        pass
+
+
+def _ip(n: int) -> str:
+    return f"ip:{n >> 24 & 255}.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}"
+
+
+async def _run(name: str, args: argparse.Namespace) -> None:
+    clock = SimulatedClock()
+    if name == "gcra":
+        limiter = InMemoryBackend(max_keys=args.max_keys, clock=clock)
+    else:
+        limiter = SlidingWindowLog(clock)
+
+    process = psutil.Process()
+    base_rss = process.memory_info().rss
+    step = args.ips // 10
+    last_sweep = clock.now
+    started = time.perf_counter()
+
+    print(f"{name}: {'ips':>10} {'live keys':>10} {'rss MiB':>8}")
+    for n in range(1, args.ips + 1):
+        await limiter.is_allowed(_ip(n), args.limit, args.window)
+        clock.now += 1 / args.rate
+        if clock.now - last_sweep >= args.sweep_interval:
+            await limiter.sweep()
+            last_sweep = clock.now
+        if n % step == 0:
+            rss = (process.memory_info().rss - base_rss) / 2**20
+            print(f"{name}: {n:>10} {len(limiter):>10} {rss:>8.1f}")
+
+    elapsed = time.perf_counter() - started
+    print(f"{name}: {args.ips / elapsed:,.0f} requests/s\n")
+
+
+def run(name: str, args: argparse.Namespace) -> None:
+    asyncio.run(_run(name, args))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ips", type=int, default=3_000_000)
+    parser.add_argument("--rate", type=float, default=5000, help="requests/s")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--window", type=int, default=3600, help="seconds")
+    parser.add_argument("--sweep-interval", type=float, default=60)
+    parser.add_argument("--max-keys", type=int, default=1_000_000)
+    parser.add_argument("--compare", action="store_true")
+    args = parser.parse_args()
+
+    # Each limiter runs in a fresh process so RSS numbers do not mix
+    for name in ["gcra", "sliding-window"] if args.compare else ["gcra"]:
+        process = multiprocessing.Process(target=run, args=(name, args))
+        process.start()
+        process.join()
+
+
+if __name__ == "__main__":
+    main()